@@ -11,7 +11,7 @@ if _ml456_path not in sys.path:
     sys.path.insert(0, _ml456_path)
 
 from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Query, Header
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse
@@ -1097,6 +1097,13 @@ async def startup():
     except Exception as e:
         print(f"⚠️  Baseline manager error: {e}")
 
+    # Start loading the ML456 predictor in the background
+    try:
+        from ml_models.external_predictor import get_external_predictor
+        get_external_predictor()
+    except Exception as e:
+        print(f"⚠️  ML456 predictor warm-up error: {e}")
+
     # Initialize serial handler for Arduino (optional) - REMOVED: Live monitoring disabled
     # try:
     #     serial_handler = SerialHandler(auto_connect=False)
@@ -1150,19 +1157,13 @@ async def train_baseline_endpoint(file_id: str, baseline_name: str = "baseline")
         
         print(f"🎓 Training baseline model '{baseline_name}' from file {file_id}...")
         
-        # Convert numpy array to dictionary format expected by FeatureExtractor
-        sensor_dict = {}
-        num_sensors = baseline_data.shape[1] if len(baseline_data.shape) > 1 else 1
-        
-        for sensor_id in range(num_sensors):
-            if len(baseline_data.shape) > 1:
-                sensor_dict[sensor_id] = baseline_data[:, sensor_id]
-            else:
-                sensor_dict[sensor_id] = baseline_data
+        # One row per sensor, as FeatureExtractor.extract_features_array expects
+        sensor_array = baseline_data.T if len(baseline_data.shape) > 1 else baseline_data[None]
+        num_sensors = sensor_array.shape[0]
         
         # Extract features
         feature_extractor = FeatureExtractor(num_sensors=num_sensors)
-        baseline_features = feature_extractor.extract_features(sensor_dict)
+        baseline_features = feature_extractor.extract_features_array(sensor_array)
         
         # Get or initialize ML manager
         ml_manager = get_ml_manager()
@@ -1266,7 +1267,8 @@ async def predict_baseline_endpoint(file_id: str):
             "timestamp": datetime.now()
         }
         
-        return {
+        # orjson writes the predicted baseline array straight to JSON
+        return ORJSONResponse(content={
             "success": True,
             "file_id": file_id,
             "prediction_id": prediction_id,
@@ -1277,7 +1279,7 @@ async def predict_baseline_endpoint(file_id: str):
             "warning": ml_result.get('warning'),
             "recommendation": ml_result.get('recommendation'),
             "timestamp": datetime.now().isoformat()
-        }
+        })
         
     except HTTPException:
         raise
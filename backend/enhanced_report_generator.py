@@ -4,18 +4,67 @@ Enhanced Structural Repair Quality Analysis Report
 Includes Hexagon Radar Chart, All Graphs, and Professional Layout
 """
 
+import copy
 import json
-import base64
-from io import BytesIO
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import pandas as pd
+from dataclasses import dataclass
+from functools import lru_cache
 import numpy as np
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Output buffer size for the report file (reports with embedded chart data can be several MB)
+REPORT_WRITE_BUFFER = 1 << 20
+
+# Score-only charts are memoized on scores rounded to this many decimals
+SCORE_CACHE_DECIMALS = 6
+
+def _score_key(quality_data, *keys):
+    """Hashable cache key built from rounded quality scores"""
+    return tuple(round(float(quality_data.get(k, 0)), SCORE_CACHE_DECIMALS) for k in keys)
+
+@dataclass
+class ModalArrays:
+    """Modal parameters of all three states as float64 arrays"""
+    orig_freqs: np.ndarray
+    dmg_freqs: np.ndarray
+    rep_freqs: np.ndarray
+    orig_damping: np.ndarray
+    dmg_damping: np.ndarray
+    rep_damping: np.ndarray
+    
+    @property
+    def modes(self):
+        return list(range(1, len(self.orig_freqs) + 1))
+
+def _normalize_modal_data(modal_data):
+    """Convert the modal_data dict to ndarrays once, shared by every chart"""
+    def arr(state, key, default=()):
+        return np.asarray(modal_data[state].get(key, default), dtype=np.float64)
+    
+    return ModalArrays(
+        orig_freqs=arr('original', 'natural_frequencies_hz'),
+        dmg_freqs=arr('damaged', 'natural_frequencies_hz'),
+        rep_freqs=arr('repaired', 'natural_frequencies_hz'),
+        orig_damping=arr('original', 'damping', (0,) * 5),
+        dmg_damping=arr('damaged', 'damping', (0,) * 5),
+        rep_damping=arr('repaired', 'damping', (0,) * 5)
+    )
+
 def create_hexagon_chart(quality_data):
     """
     Create a hexagon (radar chart) showing all quality metrics
     """
+    key = _score_key(quality_data, 'frequency', 'mode_shape', 'damping', 'overall')
+    # Copy so callers can't mutate the cached spec
+    return copy.deepcopy(_build_hexagon_chart(*key))
+
+@lru_cache(maxsize=64)
+def _build_hexagon_chart(freq_recovery, mode_shape, damping, overall):
+    """Build the hexagon chart spec from scores (0-1 range)"""
     categories = [
         'Frequency<br>Recovery',
         'Mode Shape<br>Match',
@@ -25,40 +74,32 @@ def create_hexagon_chart(quality_data):
         'Repair<br>Effectiveness'
     ]
     
-    # Extract scores (0-1 range)
-    freq_recovery = quality_data.get('frequency', 0)
-    mode_shape = quality_data.get('mode_shape', 0)
-    damping = quality_data.get('damping', 0)
-    overall = quality_data.get('overall', 0)
-    
-    # Calculate derived metrics
-    structural_integrity = (freq_recovery + damping) / 2
-    repair_effectiveness = (mode_shape + overall) / 2
-    
-    values = [
-        freq_recovery * 100,
-        mode_shape * 100,
-        damping * 100,
-        overall * 100,
-        structural_integrity * 100,
-        repair_effectiveness * 100
-    ]
+    # Percent scores incl. derived metrics (structural integrity, repair effectiveness)
+    values = np.array([
+        freq_recovery,
+        mode_shape,
+        damping,
+        overall,
+        (freq_recovery + damping) / 2,
+        (mode_shape + overall) / 2
+    ], dtype=np.float64) * 100
     
     # Close the chart (repeat first value at end)
-    values += values[:1]
-    categories_plot = categories + [categories[0]]
+    values = np.concatenate([values, values[:1]])
+    categories_plot = categories + categories[:1]
     
-    fig = go.Figure(data=go.Scatterpolar(
-        r=values,
+    data = [dict(
+        type='scatterpolar',
+        r=values.tolist(),
         theta=categories_plot,
         fill='toself',
         fillcolor='rgba(102, 126, 234, 0.4)',
         line=dict(color='rgba(102, 126, 234, 0.8)', width=2),
         marker=dict(size=8, color='rgba(102, 126, 234, 1)'),
         name='Quality Metrics'
-    ))
+    )]
     
-    fig.update_layout(
+    layout = dict(
         polar=dict(
             radialaxis=dict(
                 visible=True,
@@ -89,56 +130,57 @@ def create_hexagon_chart(quality_data):
         font=dict(family='Inter, sans-serif', color='#e0e6ed')
     )
     
-    return fig
+    return dict(data=data, layout=layout)
 
-def create_frequency_comparison_chart(modal_data):
+def create_frequency_comparison_chart(modal):
     """
     Create bar chart comparing frequencies across states
     """
-    modes = list(range(1, len(modal_data['original']['natural_frequencies_hz']) + 1))
+    modes = modal.modes
     
-    fig = go.Figure(data=[
-        go.Bar(
+    data = [
+        dict(
+            type='bar',
             x=modes,
-            y=modal_data['original']['natural_frequencies_hz'],
+            y=modal.orig_freqs.tolist(),
             name='Original',
             marker=dict(color='rgba(0, 217, 255, 0.8)'),
             hovertemplate='<b>Mode %{x}</b><br>Frequency: %{y:.2f} Hz<extra></extra>'
         ),
-        go.Bar(
+        dict(
+            type='bar',
             x=modes,
-            y=modal_data['damaged']['natural_frequencies_hz'],
+            y=modal.dmg_freqs.tolist(),
             name='Damaged',
             marker=dict(color='rgba(255, 107, 107, 0.8)'),
             hovertemplate='<b>Mode %{x}</b><br>Frequency: %{y:.2f} Hz<extra></extra>'
         ),
-        go.Bar(
+        dict(
+            type='bar',
             x=modes,
-            y=modal_data['repaired']['natural_frequencies_hz'],
+            y=modal.rep_freqs.tolist(),
             name='Repaired',
             marker=dict(color='rgba(76, 175, 80, 0.8)'),
             hovertemplate='<b>Mode %{x}</b><br>Frequency: %{y:.2f} Hz<extra></extra>'
         )
-    ])
+    ]
     
-    fig.update_layout(
-        title='<b>Frequency Comparison Across States</b>',
-        xaxis_title='Mode Number',
-        yaxis_title='Frequency (Hz)',
+    layout = dict(
+        title=dict(text='<b>Frequency Comparison Across States</b>'),
         barmode='group',
         hovermode='x unified',
         height=500,
         paper_bgcolor='rgba(0,0,0,0)',
         plot_bgcolor='rgba(15, 52, 96, 0.3)',
         xaxis=dict(
+            title=dict(text='Mode Number', font=dict(color='#e0e6ed')),
             gridcolor='rgba(102, 126, 234, 0.2)',
-            tickfont=dict(color='#a0a0a0'),
-            title_font=dict(color='#e0e6ed')
+            tickfont=dict(color='#a0a0a0')
         ),
         yaxis=dict(
+            title=dict(text='Frequency (Hz)', font=dict(color='#e0e6ed')),
             gridcolor='rgba(102, 126, 234, 0.2)',
-            tickfont=dict(color='#a0a0a0'),
-            title_font=dict(color='#e0e6ed')
+            tickfont=dict(color='#a0a0a0')
         ),
         legend=dict(
             x=1.02,
@@ -152,32 +194,39 @@ def create_frequency_comparison_chart(modal_data):
         font=dict(family='Inter, sans-serif', color='#e0e6ed')
     )
     
-    return fig
+    return dict(data=data, layout=layout)
 
 def create_quality_breakdown_chart(quality_data):
     """
     Create pie/donut chart for quality breakdown
     """
+    key = _score_key(quality_data, 'frequency', 'mode_shape', 'damping')
+    return copy.deepcopy(_build_quality_breakdown_chart(*key))
+
+@lru_cache(maxsize=64)
+def _build_quality_breakdown_chart(frequency, mode_shape, damping):
+    """Build the quality breakdown spec from scores (0-1 range)"""
     labels = ['Frequency Recovery', 'Mode Shape Match', 'Damping Recovery']
     values = [
-        quality_data.get('frequency', 0) * 100,
-        quality_data.get('mode_shape', 0) * 100,
-        quality_data.get('damping', 0) * 100
+        frequency * 100,
+        mode_shape * 100,
+        damping * 100
     ]
     
     colors = ['rgba(255, 193, 7, 0.8)', 'rgba(76, 175, 80, 0.8)', 'rgba(0, 217, 255, 0.8)']
     
-    fig = go.Figure(data=[go.Pie(
+    data = [dict(
+        type='pie',
         labels=labels,
         values=values,
         marker=dict(colors=colors, line=dict(color='#0f3460', width=2)),
         hovertemplate='<b>%{label}</b><br>Score: %{value:.1f}%<extra></extra>',
         textposition='inside',
         textinfo='label+percent'
-    )])
+    )]
     
-    fig.update_layout(
-        title='<b>Quality Breakdown (%)</b>',
+    layout = dict(
+        title=dict(text='<b>Quality Breakdown (%)</b>'),
         height=500,
         paper_bgcolor='rgba(0,0,0,0)',
         font=dict(family='Inter, sans-serif', color='#e0e6ed'),
@@ -192,24 +241,24 @@ def create_quality_breakdown_chart(quality_data):
         )
     )
     
-    return fig
+    return dict(data=data, layout=layout)
 
-def create_recovery_trajectory_chart(modal_data):
+def create_recovery_trajectory_chart(modal):
     """
     Create line chart showing recovery trajectory from damaged to repaired
     """
-    modes = list(range(1, len(modal_data['original']['natural_frequencies_hz']) + 1))
-    
-    original_freqs = modal_data['original']['natural_frequencies_hz']
-    damaged_freqs = modal_data['damaged']['natural_frequencies_hz']
-    repaired_freqs = modal_data['repaired']['natural_frequencies_hz']
+    modes = modal.modes
     
-    fig = go.Figure()
+    # One row per mode: (original, damaged, repaired)
+    n = len(modes)
+    trajectories = np.column_stack([modal.orig_freqs, modal.dmg_freqs[:n], modal.rep_freqs[:n]]).tolist()
     
-    for mode_idx, mode in enumerate(modes):
-        fig.add_trace(go.Scatter(
+    data = []
+    for mode, trajectory in zip(modes, trajectories):
+        data.append(dict(
+            type='scatter',
             x=['Original', 'Damaged', 'Repaired'],
-            y=[original_freqs[mode_idx], damaged_freqs[mode_idx], repaired_freqs[mode_idx]],
+            y=trajectory,
             mode='lines+markers',
             name=f'Mode {mode}',
             hovertemplate='<b>Mode %{customdata}</b><br>%{x}<br>Frequency: %{y:.2f} Hz<extra></extra>',
@@ -217,22 +266,20 @@ def create_recovery_trajectory_chart(modal_data):
             marker=dict(size=8)
         ))
     
-    fig.update_layout(
-        title='<b>Frequency Recovery Trajectory</b>',
-        xaxis_title='Structure State',
-        yaxis_title='Frequency (Hz)',
+    layout = dict(
+        title=dict(text='<b>Frequency Recovery Trajectory</b>'),
         height=500,
         paper_bgcolor='rgba(0,0,0,0)',
         plot_bgcolor='rgba(15, 52, 96, 0.3)',
         xaxis=dict(
+            title=dict(text='Structure State', font=dict(color='#e0e6ed')),
             gridcolor='rgba(102, 126, 234, 0.2)',
-            tickfont=dict(color='#a0a0a0'),
-            title_font=dict(color='#e0e6ed')
+            tickfont=dict(color='#a0a0a0')
         ),
         yaxis=dict(
+            title=dict(text='Frequency (Hz)', font=dict(color='#e0e6ed')),
             gridcolor='rgba(102, 126, 234, 0.2)',
-            tickfont=dict(color='#a0a0a0'),
-            title_font=dict(color='#e0e6ed')
+            tickfont=dict(color='#a0a0a0')
         ),
         hovermode='x unified',
         font=dict(family='Inter, sans-serif', color='#e0e6ed'),
@@ -247,87 +294,93 @@ def create_recovery_trajectory_chart(modal_data):
         )
     )
     
-    return fig
+    return dict(data=data, layout=layout)
 
-def create_damping_comparison_chart(modal_data):
+def create_damping_comparison_chart(modal):
     """Create damping ratio comparison chart"""
-    modes = list(range(1, len(modal_data['original']['natural_frequencies_hz']) + 1))
+    modes = modal.modes
+    
+    def damping_pct(damping):
+        # Scale ratios to percent in a single vectorized multiply
+        return (damping * 100).tolist()
     
-    fig = go.Figure(data=[
-        go.Bar(
+    data = [
+        dict(
+            type='bar',
             x=modes,
-            y=[d * 100 for d in modal_data['original'].get('damping', [0]*5)],
+            y=damping_pct(modal.orig_damping),
             name='Original',
             marker=dict(color='rgba(0, 217, 255, 0.8)')
         ),
-        go.Bar(
+        dict(
+            type='bar',
             x=modes,
-            y=[d * 100 for d in modal_data['damaged'].get('damping', [0]*5)],
+            y=damping_pct(modal.dmg_damping),
             name='Damaged',
             marker=dict(color='rgba(255, 107, 107, 0.8)')
         ),
-        go.Bar(
+        dict(
+            type='bar',
             x=modes,
-            y=[d * 100 for d in modal_data['repaired'].get('damping', [0]*5)],
+            y=damping_pct(modal.rep_damping),
             name='Repaired',
             marker=dict(color='rgba(76, 175, 80, 0.8)')
         )
-    ])
+    ]
     
-    fig.update_layout(
-        title='<b>Damping Ratio Comparison (%)</b>',
-        xaxis_title='Mode',
-        yaxis_title='Damping (%)',
+    layout = dict(
+        title=dict(text='<b>Damping Ratio Comparison (%)</b>'),
+        xaxis=dict(title=dict(text='Mode')),
+        yaxis=dict(title=dict(text='Damping (%)')),
         barmode='group',
         height=500,
         paper_bgcolor='rgba(0,0,0,0)',
         plot_bgcolor='rgba(15, 52, 96, 0.3)',
         font=dict(family='Inter, sans-serif', color='#e0e6ed')
     )
-    return fig
+    return dict(data=data, layout=layout)
 
-def create_energy_distribution_chart(modal_data):
+def create_energy_distribution_chart(modal):
     """Create energy distribution chart"""
-    modes = list(range(1, len(modal_data['original']['natural_frequencies_hz']) + 1))
+    modes = modal.modes
     
     # Estimate energy distribution (proportional to frequency * damping)
-    orig_energy = [modal_data['original']['natural_frequencies_hz'][i] * 10 for i in range(len(modes))]
-    total_energy = sum(orig_energy)
-    orig_energy_pct = [e/total_energy*100 for e in orig_energy]
+    orig_energy = modal.orig_freqs * 10
+    orig_energy_pct = (orig_energy / orig_energy.sum() * 100).tolist()
     
-    fig = go.Figure(data=[
-        go.Bar(
+    data = [
+        dict(
+            type='bar',
             x=modes,
             y=orig_energy_pct,
             marker=dict(color='rgba(0, 217, 255, 0.8)'),
             name='Energy Distribution'
         )
-    ])
+    ]
     
-    fig.update_layout(
-        title='<b>Modal Energy Distribution</b>',
-        xaxis_title='Mode',
-        yaxis_title='Energy (%)',
+    layout = dict(
+        title=dict(text='<b>Modal Energy Distribution</b>'),
+        xaxis=dict(title=dict(text='Mode')),
+        yaxis=dict(title=dict(text='Energy (%)')),
         height=500,
         paper_bgcolor='rgba(0,0,0,0)',
         plot_bgcolor='rgba(15, 52, 96, 0.3)',
         font=dict(family='Inter, sans-serif', color='#e0e6ed')
     )
-    return fig
+    return dict(data=data, layout=layout)
 
-def create_frequency_shift_chart(modal_data):
+def create_frequency_shift_chart(modal):
     """Create frequency shift analysis chart"""
-    modes = list(range(1, len(modal_data['original']['natural_frequencies_hz']) + 1))
-    
-    orig_freqs = modal_data['original']['natural_frequencies_hz']
-    dmg_freqs = modal_data['damaged']['natural_frequencies_hz']
-    rep_freqs = modal_data['repaired']['natural_frequencies_hz']
+    modes = modal.modes
     
-    dmg_shift = [(dmg_freqs[i] - orig_freqs[i])/orig_freqs[i]*100 for i in range(len(modes))]
-    rep_shift = [(rep_freqs[i] - orig_freqs[i])/orig_freqs[i]*100 for i in range(len(modes))]
+    orig_freqs = modal.orig_freqs
+    n = len(modes)
+    dmg_shift = ((modal.dmg_freqs[:n] - orig_freqs) / orig_freqs * 100).tolist()
+    rep_shift = ((modal.rep_freqs[:n] - orig_freqs) / orig_freqs * 100).tolist()
     
-    fig = go.Figure(data=[
-        go.Scatter(
+    data = [
+        dict(
+            type='scatter',
             x=modes,
             y=dmg_shift,
             mode='lines+markers',
@@ -335,7 +388,8 @@ def create_frequency_shift_chart(modal_data):
             line=dict(color='rgba(255, 107, 107, 0.8)', width=3),
             marker=dict(size=8)
         ),
-        go.Scatter(
+        dict(
+            type='scatter',
             x=modes,
             y=rep_shift,
             mode='lines+markers',
@@ -343,34 +397,40 @@ def create_frequency_shift_chart(modal_data):
             line=dict(color='rgba(76, 175, 80, 0.8)', width=3),
             marker=dict(size=8)
         )
-    ])
-    
-    fig.add_hline(y=0, line_dash="dash", line_color="rgba(102, 126, 234, 0.5)")
+    ]
     
-    fig.update_layout(
-        title='<b>Frequency Shift Analysis (%)</b>',
-        xaxis_title='Mode',
-        yaxis_title='Frequency Shift (%)',
+    layout = dict(
+        title=dict(text='<b>Frequency Shift Analysis (%)</b>'),
+        xaxis=dict(title=dict(text='Mode')),
+        yaxis=dict(title=dict(text='Frequency Shift (%)')),
+        # Zero-shift reference line (equivalent of fig.add_hline)
+        shapes=[dict(
+            type='line',
+            xref='paper',
+            x0=0,
+            x1=1,
+            yref='y',
+            y0=0,
+            y1=0,
+            line=dict(dash='dash', color='rgba(102, 126, 234, 0.5)')
+        )],
         height=500,
         paper_bgcolor='rgba(0,0,0,0)',
         plot_bgcolor='rgba(15, 52, 96, 0.3)',
         hovermode='x unified',
         font=dict(family='Inter, sans-serif', color='#e0e6ed')
     )
-    return fig
+    return dict(data=data, layout=layout)
 
-def create_mode_summary_chart(modal_data):
+def create_mode_summary_chart(modal):
     """Create mode summary heatmap"""
-    modes = list(range(1, len(modal_data['original']['natural_frequencies_hz']) + 1))
-    
-    orig_freqs = modal_data['original']['natural_frequencies_hz']
-    dmg_freqs = modal_data['damaged']['natural_frequencies_hz']
-    rep_freqs = modal_data['repaired']['natural_frequencies_hz']
+    modes = modal.modes
     
     # Create a summary matrix
-    z_data = [orig_freqs, dmg_freqs, rep_freqs]
+    z_data = [modal.orig_freqs.tolist(), modal.dmg_freqs.tolist(), modal.rep_freqs.tolist()]
     
-    fig = go.Figure(data=go.Heatmap(
+    data = [dict(
+        type='heatmap',
         z=z_data,
         x=modes,
         y=['Original', 'Damaged', 'Repaired'],
@@ -378,103 +438,68 @@ def create_mode_summary_chart(modal_data):
         text=[[f'{v:.2f}' for v in row] for row in z_data],
         texttemplate='%{text}',
         textfont={"size": 10},
-        colorbar=dict(title='Freq (Hz)')
-    ))
+        colorbar=dict(title=dict(text='Freq (Hz)'))
+    )]
     
-    fig.update_layout(
-        title='<b>Modal Summary Heatmap</b>',
-        xaxis_title='Mode',
+    layout = dict(
+        title=dict(text='<b>Modal Summary Heatmap</b>'),
+        xaxis=dict(title=dict(text='Mode')),
         height=400,
         paper_bgcolor='rgba(0,0,0,0)',
         font=dict(family='Inter, sans-serif', color='#e0e6ed')
     )
-    return fig
+    return dict(data=data, layout=layout)
 
-def fig_to_html(fig):
-    """Convert Plotly figure to HTML div"""
-    return fig.to_html(include_plotlyjs=False, div_id=None)
+def figures_to_json(figs):
+    """Serialize a dict of {div_id: {data, layout}} figure specs to JSON text"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(figs, option=orjson.OPT_SERIALIZE_NUMPY).decode('utf-8')
+    return json.dumps(figs, default=lambda o: o.tolist() if hasattr(o, 'tolist') else str(o))
 
-def create_enhanced_report(analysis_data, modal_data, quality_data, output_file="enhanced_report.html"):
-    """
-    Create comprehensive enhanced HTML report with all visualizations
+def figures_to_script(figs):
     """
-    try:
-        print(f"Starting enhanced report generation for: {output_file}")
-        
-        # Generate all charts
-        print("Generating hexagon chart...")
-        hexagon_chart = create_hexagon_chart(quality_data)
-        print("Generating frequency comparison chart...")
-        freq_chart = create_frequency_comparison_chart(modal_data)
-        print("Generating quality breakdown chart...")
-        quality_chart = create_quality_breakdown_chart(quality_data)
-        print("Generating recovery trajectory chart...")
-        trajectory_chart = create_recovery_trajectory_chart(modal_data)
-        
-        # Create additional graphs for completeness
-        print("Generating damping comparison chart...")
-        damping_chart = create_damping_comparison_chart(modal_data)
-        print("Generating energy distribution chart...")
-        energy_chart = create_energy_distribution_chart(modal_data)
-        print("Generating frequency shift chart...")
-        frequency_shift_chart = create_frequency_shift_chart(modal_data)
-        print("Generating mode summary chart...")
-        mode_summary_chart = create_mode_summary_chart(modal_data)
-        
-        # Convert to HTML
-        print("Converting charts to HTML...")
-        hexagon_html = fig_to_html(hexagon_chart)
-        freq_html = fig_to_html(freq_chart)
-        quality_html = fig_to_html(quality_chart)
-        trajectory_html = fig_to_html(trajectory_chart)
-        damping_html = fig_to_html(damping_chart)
-        energy_html = fig_to_html(energy_chart)
-        frequency_shift_html = fig_to_html(frequency_shift_chart)
-        mode_summary_html = fig_to_html(mode_summary_chart)
-    except Exception as e:
-        print(f"ERROR during chart generation: {e}")
-        import traceback
-        traceback.print_exc()
-        raise
+    Render all figure specs with one inline <script>.
     
-    # Prepare data for display
-    interpretation = quality_data.get('interpretation', 'Analysis Complete')
-    overall_score = quality_data.get('overall', 0) * 100
-    
-    original_freqs = modal_data['original']['natural_frequencies_hz'][:5]
-    damaged_freqs = modal_data['damaged']['natural_frequencies_hz'][:5]
-    repaired_freqs = modal_data['repaired']['natural_frequencies_hz'][:5]
-    
-    # HTML Template
-    html_content = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Enhanced Structural Repair Analysis Report</title>
-    <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
-    <style>
-        * {{
+    The specs are embedded as a single JSON string literal and parsed with
+    JSON.parse (cheaper for browsers than an equivalent object literal), then
+    every div is plotted in one loop.
+    """
+    # Escape '</' so chart text can never terminate the surrounding <script>
+    literal = json.dumps(figures_to_json(figs)).replace('</', '<\\/')
+    return (
+        '<script>'
+        f'const F = JSON.parse({literal}); '
+        'Object.entries(F).forEach(([k, v]) => '
+        'Plotly.newPlot(k, v.data, v.layout, {responsive: true}));'
+        '</script>'
+    )
+
+# ---------------------------------------------------------------------------
+# HTML template fragments (static text is built once at import; only the
+# dynamic spans are filled per report with str.format_map)
+# ---------------------------------------------------------------------------
+
+_STYLE = """    <style>
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        body {{
+        body {
             font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
             background: linear-gradient(135deg, #0a0e27 0%, #16213e 50%, #0f3460 100%);
             color: #e0e6ed;
             line-height: 1.8;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 1600px;
             margin: 0 auto;
             padding: 40px 20px;
-        }}
+        }
         
-        header {{
+        header {
             text-align: center;
             margin-bottom: 60px;
             padding: 60px 40px;
@@ -482,76 +507,76 @@ def create_enhanced_report(analysis_data, modal_data, quality_data, output_file=
             border: 2px solid rgba(102, 126, 234, 0.5);
             border-radius: 15px;
             backdrop-filter: blur(10px);
-        }}
+        }
         
-        h1 {{
+        h1 {
             font-size: 2.5em;
             margin-bottom: 10px;
             color: #66feff;
             text-shadow: 0 0 20px rgba(102, 126, 234, 0.5);
-        }}
+        }
         
-        .subtitle {{
+        .subtitle {
             font-size: 1.2em;
             color: #a0a0a0;
             margin-bottom: 20px;
-        }}
+        }
         
-        .score-display {{
+        .score-display {
             display: flex;
             justify-content: center;
             gap: 40px;
             margin-top: 30px;
             flex-wrap: wrap;
-        }}
+        }
         
-        .score-card {{
+        .score-card {
             background: rgba(15, 52, 96, 0.5);
             padding: 20px 40px;
             border-radius: 10px;
             border: 1px solid rgba(102, 126, 234, 0.3);
             min-width: 200px;
-        }}
+        }
         
-        .score-value {{
+        .score-value {
             font-size: 2.5em;
             font-weight: bold;
             color: #66feff;
-        }}
+        }
         
-        .score-label {{
+        .score-label {
             font-size: 0.9em;
             color: #a0a0a0;
             margin-top: 5px;
-        }}
+        }
         
-        .interpretation {{
+        .interpretation {
             font-size: 1.3em;
             color: #66feff;
             margin-top: 20px;
             font-weight: 600;
-        }}
+        }
         
-        .charts-grid {{
+        .charts-grid {
             display: grid;
             grid-template-columns: 1fr 1fr;
             gap: 30px;
             margin: 60px 0;
-        }}
+        }
         
-        .chart-container {{
+        .chart-container {
             background: rgba(15, 52, 96, 0.3);
             border: 1px solid rgba(102, 126, 234, 0.3);
             border-radius: 10px;
             padding: 20px;
             backdrop-filter: blur(10px);
-        }}
+        }
         
-        .full-width {{
+        .full-width {
             grid-column: 1 / -1;
-        }}
+        }
         
-        .modal-table {{
+        .modal-table {
             width: 100%;
             border-collapse: collapse;
             margin: 30px 0;
@@ -559,125 +584,137 @@ def create_enhanced_report(analysis_data, modal_data, quality_data, output_file=
             border: 1px solid rgba(102, 126, 234, 0.3);
             border-radius: 10px;
             overflow: hidden;
-        }}
+        }
         
-        .modal-table th {{
+        .modal-table th {
             background: rgba(102, 126, 234, 0.2);
             padding: 15px;
             text-align: left;
             border-bottom: 2px solid rgba(102, 126, 234, 0.5);
             font-weight: 600;
             color: #66feff;
-        }}
+        }
         
-        .modal-table td {{
+        .modal-table td {
             padding: 12px 15px;
             border-bottom: 1px solid rgba(102, 126, 234, 0.2);
-        }}
+        }
         
-        .modal-table tr:hover {{
+        .modal-table tr:hover {
             background: rgba(102, 126, 234, 0.1);
-        }}
+        }
         
-        .section {{
+        .section {
             margin: 60px 0;
             padding: 40px;
             background: rgba(15, 52, 96, 0.3);
             border: 1px solid rgba(102, 126, 234, 0.3);
             border-radius: 10px;
             backdrop-filter: blur(10px);
-        }}
+        }
         
-        .section h2 {{
+        .section h2 {
             font-size: 1.8em;
             color: #66feff;
             margin-bottom: 25px;
             border-bottom: 2px solid rgba(102, 126, 234, 0.3);
             padding-bottom: 15px;
-        }}
+        }
         
-        .metrics-row {{
+        .metrics-row {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
             gap: 20px;
             margin: 20px 0;
-        }}
+        }
         
-        .metric-box {{
+        .metric-box {
             background: rgba(102, 126, 234, 0.1);
             padding: 20px;
             border-radius: 8px;
             border-left: 4px solid rgba(102, 126, 234, 0.8);
-        }}
+        }
         
-        .metric-value {{
+        .metric-value {
             font-size: 1.8em;
             font-weight: bold;
             color: #66feff;
-        }}
+        }
         
-        .metric-label {{
+        .metric-label {
             font-size: 0.9em;
             color: #a0a0a0;
             margin-top: 5px;
-        }}
+        }
         
-        .recommendations {{
+        .recommendations {
             background: rgba(76, 175, 80, 0.1);
             border-left: 4px solid rgba(76, 175, 80, 0.8);
             padding: 20px;
             border-radius: 8px;
             margin: 20px 0;
-        }}
+        }
         
-        .recommendations h3 {{
+        .recommendations h3 {
             color: #76ba1b;
             margin-bottom: 15px;
-        }}
+        }
         
-        .recommendations ul {{
+        .recommendations ul {
             margin-left: 20px;
-        }}
+        }
         
-        .recommendations li {{
+        .recommendations li {
             margin: 10px 0;
             color: #a0a0a0;
-        }}
+        }
         
-        footer {{
+        footer {
             text-align: center;
             margin-top: 60px;
             padding-top: 30px;
             border-top: 1px solid rgba(102, 126, 234, 0.3);
             color: #a0a0a0;
-        }}
+        }
         
-        .timestamp {{
+        .timestamp {
             font-size: 0.9em;
             color: #666;
-        }}
+        }
     </style>
-</head>
-<body>
+"""
+
+_HEAD = """
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Enhanced Structural Repair Analysis Report</title>
+    <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
+""" + _STYLE + """</head>
+"""
+
+_BODY_HEADER_FMT = """<body>
     <div class="container">
         <header>
             <h1>🏗️ Structural Repair Quality Analysis</h1>
             <p class="subtitle">Comprehensive Modal Parameter Assessment & Repair Effectiveness Evaluation</p>
             <div class="score-display">
                 <div class="score-card">
-                    <div class="score-value">{overall_score:.1f}%</div>
+                    <div class="score-value">{overall_pct:.1f}%</div>
                     <div class="score-label">Overall Quality</div>
                 </div>
                 <div class="score-card">
-                    <div class="score-value">{quality_data.get('frequency', 0)*100:.1f}%</div>
+                    <div class="score-value">{frequency_pct:.1f}%</div>
                     <div class="score-label">Frequency Recovery</div>
                 </div>
                 <div class="score-card">
-                    <div class="score-value">{quality_data.get('mode_shape', 0)*100:.1f}%</div>
+                    <div class="score-value">{mode_shape_pct:.1f}%</div>
                     <div class="score-label">Mode Shape Match</div>
                 </div>
                 <div class="score-card">
-                    <div class="score-value">{quality_data.get('damping', 0)*100:.1f}%</div>
+                    <div class="score-value">{damping_pct:.1f}%</div>
                     <div class="score-label">Damping Recovery</div>
                 </div>
             </div>
@@ -690,10 +727,10 @@ def create_enhanced_report(analysis_data, modal_data, quality_data, output_file=
             <h2>📈 Quality Metrics Visualization</h2>
             <div class="charts-grid">
                 <div class="chart-container">
-                    {hexagon_html}
+                    <div id="hexagon"></div>
                 </div>
                 <div class="chart-container">
-                    {quality_html}
+                    <div id="quality"></div>
                 </div>
             </div>
         </div>
@@ -702,7 +739,7 @@ def create_enhanced_report(analysis_data, modal_data, quality_data, output_file=
             <h2>🔊 Frequency Analysis</h2>
             <div class="charts-grid full-width">
                 <div class="chart-container">
-                    {freq_html}
+                    <div id="freq"></div>
                 </div>
             </div>
             
@@ -718,124 +755,64 @@ def create_enhanced_report(analysis_data, modal_data, quality_data, output_file=
                 </thead>
                 <tbody>
 """
-    
-    # Add modal parameter rows
-    for i in range(len(original_freqs)):
-        orig = original_freqs[i]
-        dmg = damaged_freqs[i]
-        rep = repaired_freqs[i]
-        
-        # Calculate recovery (how close repaired is to original compared to damaged)
-        if orig > 0:
-            damage_deviation = abs(dmg - orig) / orig * 100
-            repair_deviation = abs(rep - orig) / orig * 100
-            if damage_deviation > 0:
-                recovery = (1 - repair_deviation / damage_deviation) * 100
-            else:
-                recovery = 100
-        else:
-            recovery = 0
-        
-        html_content += f"""
+
+_TABLE_ROW_FMT = """
                     <tr>
-                        <td><strong>Mode {i+1}</strong></td>
+                        <td><strong>Mode {mode}</strong></td>
                         <td>{orig:.2f}</td>
                         <td>{dmg:.2f}</td>
                         <td>{rep:.2f}</td>
-                        <td><span style="color: {'#76ba1b' if recovery > 50 else '#ff6b6b'}">{recovery:.1f}%</span></td>
+                        <td><span style="color: {color}">{recovery:.1f}%</span></td>
                     </tr>
 """
-    
-    html_content += """
+
+_TABLE_END = """
                 </tbody>
             </table>
         </div>
-        
-        <div class="section">
-            <h2>📊 Recovery Trajectory</h2>
-            <div class="charts-grid full-width">
-                <div class="chart-container">
 """
-    
-    html_content += trajectory_html
-    
-    html_content += f"""
-                </div>
-            </div>
-        </div>
 
+_SECTION_FMT = """
         <div class="section">
-            <h2>💧 Damping Analysis</h2>
+            <h2>{title}</h2>
             <div class="charts-grid full-width">
                 <div class="chart-container">
-"""
-    
-    html_content += damping_html
-    
-    html_content += f"""
+                    <div id="{div_id}"></div>
                 </div>
             </div>
         </div>
-
-        <div class="section">
-            <h2>⚡ Frequency Shift Analysis</h2>
-            <div class="charts-grid full-width">
-                <div class="chart-container">
 """
-    
-    html_content += frequency_shift_html
-    
-    html_content += f"""
-                </div>
-            </div>
-        </div>
 
-        <div class="section">
-            <h2>🔋 Modal Energy Distribution</h2>
-            <div class="charts-grid full-width">
-                <div class="chart-container">
-"""
-    
-    html_content += energy_html
-    
-    html_content += f"""
-                </div>
-            </div>
-        </div>
+# (title, div id) of the single-chart sections, in report order
+_CHART_SECTIONS = (
+    ('📊 Recovery Trajectory', 'trajectory'),
+    ('💧 Damping Analysis', 'damping'),
+    ('⚡ Frequency Shift Analysis', 'frequency_shift'),
+    ('🔋 Modal Energy Distribution', 'energy'),
+    ('📈 Modal Summary Heatmap', 'mode_summary'),
+)
 
-        <div class="section">
-            <h2>📈 Modal Summary Heatmap</h2>
-            <div class="charts-grid full-width">
-                <div class="chart-container">
-"""
-    
-    html_content += mode_summary_html
-    
-    html_content += f"""
-                </div>
-            </div>
-        </div>
-        
+_FOOTER_FMT = """
         <div class="section">
             <h2>💡 Detailed Analysis & Recommendations</h2>
             
             <div class="metrics-row">
                 <div class="metric-box">
-                    <div class="metric-value">{quality_data.get('frequency', 0)*100:.1f}%</div>
+                    <div class="metric-value">{frequency_pct:.1f}%</div>
                     <div class="metric-label">Frequency Recovery</div>
                     <p style="font-size: 0.85em; color: #888; margin-top: 10px;">
                         How well structural frequencies recovered after repair
                     </p>
                 </div>
                 <div class="metric-box">
-                    <div class="metric-value">{quality_data.get('mode_shape', 0)*100:.1f}%</div>
+                    <div class="metric-value">{mode_shape_pct:.1f}%</div>
                     <div class="metric-label">Mode Shape Match</div>
                     <p style="font-size: 0.85em; color: #888; margin-top: 10px;">
                         Similarity of deformation patterns across states
                     </p>
                 </div>
                 <div class="metric-box">
-                    <div class="metric-value">{quality_data.get('damping', 0)*100:.1f}%</div>
+                    <div class="metric-value">{damping_pct:.1f}%</div>
                     <div class="metric-label">Damping Recovery</div>
                     <p style="font-size: 0.85em; color: #888; margin-top: 10px;">
                         How well energy dissipation characteristics recovered
@@ -857,21 +834,127 @@ def create_enhanced_report(analysis_data, modal_data, quality_data, output_file=
         
         <footer>
             <p>Generated by Structural Repair Quality Analysis System v2.0</p>
-            <p class="timestamp">Analysis Date: {analysis_data.get('analysis_date', 'N/A')}</p>
+            <p class="timestamp">Analysis Date: {analysis_date}</p>
             <p style="margin-top: 10px; font-size: 0.85em; color: #666;">
                 This report contains proprietary analysis and should be treated as confidential.
             </p>
         </footer>
     </div>
+    {figs_script}
 </body>
 </html>
 """
+
+def create_enhanced_report(analysis_data, modal_data, quality_data, output_file="enhanced_report.html"):
+    """
+    Create comprehensive enhanced HTML report with all visualizations
+    """
+    try:
+        print(f"Starting enhanced report generation for: {output_file}")
+        
+        # Materialize modal parameters as ndarrays once for all charts
+        modal = _normalize_modal_data(modal_data)
+        
+        # Generate all chart specs ({data, layout}); rendering happens client-side
+        print("Generating hexagon chart...")
+        hexagon_chart = create_hexagon_chart(quality_data)
+        print("Generating frequency comparison chart...")
+        freq_chart = create_frequency_comparison_chart(modal)
+        print("Generating quality breakdown chart...")
+        quality_chart = create_quality_breakdown_chart(quality_data)
+        print("Generating recovery trajectory chart...")
+        trajectory_chart = create_recovery_trajectory_chart(modal)
+        
+        # Create additional graphs for completeness
+        print("Generating damping comparison chart...")
+        damping_chart = create_damping_comparison_chart(modal)
+        print("Generating energy distribution chart...")
+        energy_chart = create_energy_distribution_chart(modal)
+        print("Generating frequency shift chart...")
+        frequency_shift_chart = create_frequency_shift_chart(modal)
+        print("Generating mode summary chart...")
+        mode_summary_chart = create_mode_summary_chart(modal)
+        
+        # Serialize all figures into a single Plotly.newPlot emission
+        print("Serializing chart specs...")
+        figs = {
+            'hexagon': hexagon_chart,
+            'quality': quality_chart,
+            'freq': freq_chart,
+            'trajectory': trajectory_chart,
+            'damping': damping_chart,
+            'frequency_shift': frequency_shift_chart,
+            'energy': energy_chart,
+            'mode_summary': mode_summary_chart
+        }
+        figs_script = figures_to_script(figs)
+    except Exception as e:
+        print(f"ERROR during chart generation: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+    
+    # Prepare data for display
+    interpretation = quality_data.get('interpretation', 'Analysis Complete')
+    overall_score = quality_data.get('overall', 0) * 100
+    
+    original_freqs = modal.orig_freqs[:5].tolist()
+    damaged_freqs = modal.dmg_freqs[:5].tolist()
+    repaired_freqs = modal.rep_freqs[:5].tolist()
+    
+    # Values shared by the header and footer fragments
+    values = {
+        'overall_pct': overall_score,
+        'frequency_pct': quality_data.get('frequency', 0) * 100,
+        'mode_shape_pct': quality_data.get('mode_shape', 0) * 100,
+        'damping_pct': quality_data.get('damping', 0) * 100,
+        'interpretation': interpretation,
+        'analysis_date': analysis_data.get('analysis_date', 'N/A'),
+        'figs_script': figs_script
+    }
+    
+    # Assemble the document from pre-built fragments
+    parts = [_HEAD, _BODY_HEADER_FMT.format_map(values)]
+    
+    # Add modal parameter rows
+    for i in range(len(original_freqs)):
+        orig = original_freqs[i]
+        dmg = damaged_freqs[i]
+        rep = repaired_freqs[i]
+        
+        # Calculate recovery (how close repaired is to original compared to damaged)
+        if orig > 0:
+            damage_deviation = abs(dmg - orig) / orig * 100
+            repair_deviation = abs(rep - orig) / orig * 100
+            if damage_deviation > 0:
+                recovery = (1 - repair_deviation / damage_deviation) * 100
+            else:
+                recovery = 100
+        else:
+            recovery = 0
+        
+        parts.append(_TABLE_ROW_FMT.format(
+            mode=i + 1,
+            orig=orig,
+            dmg=dmg,
+            rep=rep,
+            color='#76ba1b' if recovery > 50 else '#ff6b6b',
+            recovery=recovery
+        ))
+    
+    parts.append(_TABLE_END)
+    for title, div_id in _CHART_SECTIONS:
+        parts.append(_SECTION_FMT.format(title=title, div_id=div_id))
+    parts.append(_FOOTER_FMT.format_map(values))
+    
+    html_content = ''.join(parts)
     
     # Write to file
     try:
         print(f"Writing HTML report to: {output_file}")
-        with open(output_file, 'w') as f:
-            f.write(html_content)
+        # Single large buffered binary write instead of default 8 KB text buffering
+        with open(output_file, 'wb', buffering=REPORT_WRITE_BUFFER) as f:
+            f.write(html_content.encode('utf-8'))
         
         # Verify file was written
         import os
@@ -13,12 +13,28 @@ This improved system:
 3. Provides meaningful quality scores for both repair strategies
 """
 
+import copy
+import math
+from bisect import bisect_right
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Dict, Optional, Tuple
 import numpy as np
 
+from repair_analyzer import _mac
 
-@dataclass
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# A damping change counts as significant above either threshold
+DAMPING_CHANGE_THRESHOLD_REL = 0.10
+DAMPING_CHANGE_THRESHOLD_ABS = 0.005
+
+
+@dataclass(slots=True, frozen=True)
 class ImprovedQualityBreakdown:
     """Enhanced quality breakdown with repair type awareness"""
     frequency_recovery: float
@@ -28,7 +44,7 @@ class ImprovedQualityBreakdown:
     strengthening_factor: float  # How much beyond original (1.0 = restoration, >1.0 = strengthened)
     
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ImprovedQualityAssessment:
     """Enhanced quality assessment with repair type classification"""
     overall_score: float
@@ -40,6 +56,24 @@ class ImprovedQualityAssessment:
     repair_strategy: str  # User-friendly description
     
 
+def _geometric_mean(values: List[float]) -> float:
+    """
+    Geometric mean of a short list of ratios in plain Python.
+    
+    For the handful of modes we deal with, scalar math beats NumPy's
+    per-call dispatch. Empty and non-positive inputs follow NumPy semantics
+    (mean of nothing -> nan, log(0) -> 0.0 result, log(negative) -> nan).
+    """
+    if not values:
+        return float('nan')
+    smallest = min(values)
+    if smallest < 0:
+        return float('nan')
+    if smallest == 0:
+        return 0.0
+    return math.exp(sum(math.log(v) for v in values) / len(values))
+
+
 def detect_repair_type(fO: np.ndarray, fD: np.ndarray, fR: np.ndarray, 
                       threshold_pct: float = 3.0) -> Tuple[str, float]:
     """
@@ -56,16 +90,21 @@ def detect_repair_type(fO: np.ndarray, fD: np.ndarray, fR: np.ndarray,
             - repair_type: 'restoration', 'retrofitting', or 'mixed'
             - strengthening_factor: Average ratio fR/fO (1.0 = restored, >1.0 = strengthened)
     """
+    # Only a few modes: one pass in plain Python is cheaper than several
+    # small NumPy array allocations
+    pairs = list(zip(np.asarray(fR, dtype=float).tolist(), np.asarray(fO, dtype=float).tolist()))
+    ratios = [r / o for r, o in pairs]
+    
     # Calculate how much repaired exceeds original
-    exceed_pct = ((fR - fO) / fO) * 100
+    exceed_pct = [((r - o) / o) * 100 for r, o in pairs]
     
     # Calculate strengthening factor (geometric mean to handle multiple modes)
-    strengthening_factor = float(np.exp(np.mean(np.log(fR / fO))))
+    strengthening_factor = _geometric_mean(ratios)
     
     # Classify based on threshold
     n_modes = len(exceed_pct)
-    n_strengthened = np.sum(exceed_pct > threshold_pct)
-    n_restored = np.sum(np.abs(exceed_pct) <= threshold_pct)
+    n_strengthened = sum(e > threshold_pct for e in exceed_pct)
+    n_restored = sum(abs(e) <= threshold_pct for e in exceed_pct)
     
     if n_strengthened >= 0.7 * n_modes:
         return 'retrofitting', strengthening_factor
@@ -123,26 +162,20 @@ def calculate_frequency_quality_retrofitting(fO: np.ndarray, fD: np.ndarray,
     denom = fO - fD
     denom = np.where(np.abs(denom) < 1e-6, np.sign(denom) * 1e-6 + 1e-6, denom)
     
-    # Initialize quality scores
-    Q = np.zeros_like(fR)
+    # Both cases are evaluated for every mode and blended with np.where
+    # (branchless; no masked fancy-index assignments)
     
     # Case 1: Partial restoration (fR < fO)
-    mask_partial = fR < fO
-    if np.any(mask_partial):
-        Q[mask_partial] = 0.5 * np.clip((fR[mask_partial] - fD[mask_partial]) / denom[mask_partial], 0.0, 1.0)
+    partial = 0.5 * np.clip((fR - fD) / denom, 0.0, 1.0)
     
     # Case 2: Full restoration + strengthening (fR >= fO)
-    mask_full = fR >= fO
-    if np.any(mask_full):
-        # Base score for restoration: 0.5
-        restoration_score = 0.5
-        
-        # Strengthening bonus: scale from 0 to 0.5 based on improvement
-        # 20% improvement = max score
-        strengthening_pct = (fR[mask_full] - fO[mask_full]) / fO[mask_full]
-        strengthening_score = 0.5 * np.clip(strengthening_pct / 0.20, 0.0, 1.0)
-        
-        Q[mask_full] = restoration_score + strengthening_score
+    # Base score for restoration: 0.5
+    # Strengthening bonus: scale from 0 to 0.5 based on improvement
+    # 20% improvement = max score
+    strengthening_pct = (fR - fO) / fO
+    full = 0.5 + 0.5 * np.clip(strengthening_pct / 0.20, 0.0, 1.0)
+    
+    Q = np.where(fR < fO, partial, full)
     
     return np.clip(Q, 0.0, 1.0)
 
@@ -157,26 +190,106 @@ def calculate_frequency_quality_mixed(fO: np.ndarray, fD: np.ndarray,
     - If mode exceeded original by >3%, use retrofitting formula
     - Otherwise, use restoration formula
     """
-    Q = np.zeros_like(fR)
-    
     # Determine per-mode strategy
     exceed_pct = ((fR - fO) / fO) * 100
     
-    # Modes that are clearly strengthened
-    mask_retro = exceed_pct > 3.0
-    mask_resto = ~mask_retro
+    # Both formulas are elementwise, so score every mode both ways and
+    # pick per mode: retrofitting where clearly strengthened
+    retro = calculate_frequency_quality_retrofitting(fO, fD, fR)
+    resto = calculate_frequency_quality_restoration(fO, fD, fR)
     
-    if np.any(mask_retro):
-        Q[mask_retro] = calculate_frequency_quality_retrofitting(
-            fO[mask_retro], fD[mask_retro], fR[mask_retro]
-        )
+    return np.where(exceed_pct > 3.0, retro, resto)
+
+
+def _damping_quality_numpy(zO: np.ndarray, zD: np.ndarray, zR: np.ndarray,
+                           out: np.ndarray) -> float:
+    """
+    Per-mode damping recovery written into `out`; returns the mean.
+    
+    Significant damping changes are scored relative to the damage-induced
+    change, insignificant ones against a fixed 0.02 tolerance.
+    """
+    denom_z = np.abs(zD - zO)
+    
+    significant_change = (denom_z > DAMPING_CHANGE_THRESHOLD_REL * np.abs(zO)) | (denom_z > DAMPING_CHANGE_THRESHOLD_ABS)
+    
+    out[:] = 0.0
     
-    if np.any(mask_resto):
-        Q[mask_resto] = calculate_frequency_quality_restoration(
-            fO[mask_resto], fD[mask_resto], fR[mask_resto]
+    if np.any(significant_change):
+        denom_z_safe = np.where(denom_z < 1e-6, 1e-6, denom_z)
+        out[significant_change] = np.clip(
+            1.0 - np.abs(zR[significant_change] - zO[significant_change]) / denom_z_safe[significant_change],
+            0.0, 1.0
         )
     
-    return Q
+    if np.any(~significant_change):
+        error = np.abs(zR[~significant_change] - zO[~significant_change])
+        out[~significant_change] = np.clip(1.0 - error / 0.02, 0.0, 1.0)
+    
+    return float(np.mean(out))
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, error_model='numpy')
+    def _damping_quality(zO, zD, zR, out):
+        """Same as _damping_quality_numpy as a single allocation-free loop"""
+        n = zO.shape[0]
+        acc = 0.0
+        for i in range(n):
+            denom = abs(zD[i] - zO[i])
+            error = abs(zR[i] - zO[i])
+            if denom > DAMPING_CHANGE_THRESHOLD_REL * abs(zO[i]) or denom > DAMPING_CHANGE_THRESHOLD_ABS:
+                q = 1.0 - error / max(denom, 1e-6)
+            else:
+                q = 1.0 - error / 0.02
+            q = min(max(q, 0.0), 1.0)
+            out[i] = q
+            acc += q
+        return acc / n
+else:
+    _damping_quality = _damping_quality_numpy
+
+
+# Frequency quality formula per repair type (anything else scores as mixed)
+_FREQ_FN = {
+    'restoration': calculate_frequency_quality_restoration,
+    'retrofitting': calculate_frequency_quality_retrofitting,
+    'mixed': calculate_frequency_quality_mixed,
+}
+
+# Interpretation ladders: ascending score thresholds and, one level per
+# band, (interpretation, code, strategy). Mixed repairs use the restoration
+# ladder.
+_RETROFITTING_LADDER = (
+    (0.50, 0.60, 0.75, 0.90),
+    (
+        ("Poor Retrofitting - Insufficient Improvement", "POOR_RETRO",
+         "Retrofitting did not achieve strengthening goals"),
+        ("Fair Retrofitting - Minimal Strengthening", "FAIR_RETRO",
+         "Limited strengthening, consider additional reinforcement"),
+        ("Good Retrofitting - Moderate Strengthening", "GOOD_RETRO",
+         "Acceptable strengthening with partial improvement"),
+        ("Very Good Retrofitting - Substantial Strengthening", "VERY_GOOD_RETRO",
+         "Effective strengthening beyond original capacity"),
+        ("Excellent Retrofitting - Significant Strengthening Achieved", "EXCELLENT_RETRO",
+         "Advanced strengthening with excellent structural improvement"),
+    ),
+)
+_RESTORATION_LADDER = (
+    (0.50, 0.70, 0.85, 0.95),
+    (
+        ("Poor Restoration - Minimal Recovery", "POOR_RESTO",
+         "Minimal restoration, significant deficiencies remain"),
+        ("Fair Restoration - Partial Recovery", "FAIR_RESTO",
+         "Partial restoration, some properties still degraded"),
+        ("Good Restoration - Acceptable Recovery", "GOOD_RESTO",
+         "Acceptable restoration with most properties recovered"),
+        ("Very Good Restoration - Highly Effective", "VERY_GOOD_RESTO",
+         "Effective restoration of original structural properties"),
+        ("Excellent Restoration - Nearly Perfect Recovery", "EXCELLENT_RESTO",
+         "Outstanding restoration to original condition"),
+    ),
+)
 
 
 def calculate_improved_repair_quality(
@@ -202,105 +315,78 @@ def calculate_improved_repair_quality(
     Returns:
         ImprovedQualityAssessment with appropriate scoring
     """
-    # Convert to numpy arrays
-    fO_arr = np.array(fO, dtype=float)
-    fD_arr = np.array(fD, dtype=float)
-    fR_arr = np.array(fR, dtype=float)
+    # Exact float tuples as the cache key: damping recovery divides by
+    # (zD - zO), so even 1e-6 rounding would visibly shift scores
+    def key(values):
+        return tuple(map(float, values))
+    
+    result = _calculate_improved_repair_quality(
+        key(fO), key(fD), key(fR),
+        tuple(key(shape) for shape in mO), tuple(key(shape) for shape in mR),
+        key(zO), key(zD), key(zR),
+        user_specified_type
+    )
+    # Copy so callers can't mutate the cached assessment
+    return copy.deepcopy(result)
+
+
+@lru_cache(maxsize=1024)
+def _calculate_improved_repair_quality(fO, fD, fR, mO, mR, zO, zD, zR, user_specified_type):
+    """Cached core of calculate_improved_repair_quality (tuple inputs)"""
+    # Pack all per-mode signals into one (8, n) buffer: rows 0-5 hold the
+    # inputs, rows 6-7 are scratch for the per-mode damping and MAC scores.
+    # Row views replace six separate array conversions.
+    n_modes = len(fO)
+    signals = np.empty((8, n_modes), dtype=float)
+    signals[:6] = (fO, fD, fR, zO, zD, zR)
+    fO_arr, fD_arr, fR_arr, zO_arr, zD_arr, zR_arr, Q_damp_i, Q_shape_i = signals
     
     # Detect repair type
     if user_specified_type:
         repair_type = user_specified_type
-        strengthening_factor = float(np.exp(np.mean(np.log(fR_arr / fO_arr))))
+        strengthening_factor = _geometric_mean([r / o for r, o in zip(fR, fO)])
     else:
         repair_type, strengthening_factor = detect_repair_type(fO_arr, fD_arr, fR_arr)
     
     # Calculate frequency quality based on type
-    if repair_type == 'restoration':
-        Q_freq_i = calculate_frequency_quality_restoration(fO_arr, fD_arr, fR_arr)
-    elif repair_type == 'retrofitting':
-        Q_freq_i = calculate_frequency_quality_retrofitting(fO_arr, fD_arr, fR_arr)
-    else:  # mixed
-        Q_freq_i = calculate_frequency_quality_mixed(fO_arr, fD_arr, fR_arr)
+    freq_fn = _FREQ_FN.get(repair_type, calculate_frequency_quality_mixed)
+    Q_freq_i = freq_fn(fO_arr, fD_arr, fR_arr)
     
     Q_frequency = float(np.mean(Q_freq_i))
     
     # Mode shape matching (unchanged - works for both types)
-    from repair_analyzer import _mac
-    Q_shape_i = []
-    for i in range(len(fO)):
-        if i < len(mO) and i < len(mR):
-            phiO = np.array(mO[i])
-            phiR = np.array(mR[i])
-            if len(phiO) > 0 and len(phiR) > 0 and len(phiO) == len(phiR):
-                Q_shape_i.append(_mac(phiO, phiR))
+    mO, mR = mO[:n_modes], mR[:n_modes]
+    shape_lengths = {len(phi) for phi in mO} | {len(phi) for phi in mR}
+    if len(mO) == len(mR) == n_modes and len(shape_lengths) == 1 and 0 not in shape_lengths:
+        # Common case: every mode has the same sensor count, so compute all
+        # MAC values at once from (n_modes, n_sensors) stacks
+        MO = np.asarray(mO, dtype=float)
+        MR = np.asarray(mR, dtype=float)
+        num = np.einsum('ij,ij->i', MO, MR) ** 2
+        den = np.einsum('ij,ij->i', MO, MO) * np.einsum('ij,ij->i', MR, MR)
+        Q_shape_i[:] = 0.0
+        np.divide(num, den, out=Q_shape_i, where=den > 0)
+        np.clip(Q_shape_i, 0.0, 1.0, out=Q_shape_i)
+    else:
+        for i in range(n_modes):
+            if i < len(mO) and i < len(mR) and 0 < len(mO[i]) == len(mR[i]):
+                Q_shape_i[i] = _mac(np.asarray(mO[i]), np.asarray(mR[i]))
             else:
-                Q_shape_i.append(0.0)
-        else:
-            Q_shape_i.append(0.0)
-    Q_shape = float(np.mean(Q_shape_i)) if Q_shape_i else 0.0
+                Q_shape_i[i] = 0.0
+    Q_shape = float(Q_shape_i.mean()) if n_modes else 0.0
     
     # Damping recovery (unchanged - works for both types)
-    zO_arr = np.array(zO, dtype=float)
-    zD_arr = np.array(zD, dtype=float)
-    zR_arr = np.array(zR, dtype=float)
-    
-    denom_z = np.abs(zD_arr - zO_arr)
-    DAMPING_CHANGE_THRESHOLD_REL = 0.10
-    DAMPING_CHANGE_THRESHOLD_ABS = 0.005
-    
-    significant_change = (denom_z > DAMPING_CHANGE_THRESHOLD_REL * np.abs(zO_arr)) | (denom_z > DAMPING_CHANGE_THRESHOLD_ABS)
-    
-    Q_damp_i = np.zeros(len(fO))
-    
-    if np.any(significant_change):
-        denom_z_safe = np.where(denom_z < 1e-6, 1e-6, denom_z)
-        Q_damp_i[significant_change] = np.clip(
-            1.0 - np.abs(zR_arr[significant_change] - zO_arr[significant_change]) / denom_z_safe[significant_change],
-            0.0, 1.0
-        )
-    
-    if np.any(~significant_change):
-        error = np.abs(zR_arr[~significant_change] - zO_arr[~significant_change])
-        Q_damp_i[~significant_change] = np.clip(1.0 - error / 0.02, 0.0, 1.0)
-    
-    Q_damping = float(np.mean(Q_damp_i))
+    Q_damping = float(_damping_quality(zO_arr, zD_arr, zR_arr, Q_damp_i))
     
     # Overall score (weighted average)
     overall = 0.5 * Q_frequency + 0.3 * Q_shape + 0.2 * Q_damping
     
     # Interpretation based on score AND repair type
-    if repair_type == 'retrofitting':
-        if overall >= 0.90:
-            interp = ("Excellent Retrofitting - Significant Strengthening Achieved", "EXCELLENT_RETRO")
-            strategy = "Advanced strengthening with excellent structural improvement"
-        elif overall >= 0.75:
-            interp = ("Very Good Retrofitting - Substantial Strengthening", "VERY_GOOD_RETRO")
-            strategy = "Effective strengthening beyond original capacity"
-        elif overall >= 0.60:
-            interp = ("Good Retrofitting - Moderate Strengthening", "GOOD_RETRO")
-            strategy = "Acceptable strengthening with partial improvement"
-        elif overall >= 0.50:
-            interp = ("Fair Retrofitting - Minimal Strengthening", "FAIR_RETRO")
-            strategy = "Limited strengthening, consider additional reinforcement"
-        else:
-            interp = ("Poor Retrofitting - Insufficient Improvement", "POOR_RETRO")
-            strategy = "Retrofitting did not achieve strengthening goals"
-    else:  # restoration or mixed
-        if overall >= 0.95:
-            interp = ("Excellent Restoration - Nearly Perfect Recovery", "EXCELLENT_RESTO")
-            strategy = "Outstanding restoration to original condition"
-        elif overall >= 0.85:
-            interp = ("Very Good Restoration - Highly Effective", "VERY_GOOD_RESTO")
-            strategy = "Effective restoration of original structural properties"
-        elif overall >= 0.70:
-            interp = ("Good Restoration - Acceptable Recovery", "GOOD_RESTO")
-            strategy = "Acceptable restoration with most properties recovered"
-        elif overall >= 0.50:
-            interp = ("Fair Restoration - Partial Recovery", "FAIR_RESTO")
-            strategy = "Partial restoration, some properties still degraded"
-        else:
-            interp = ("Poor Restoration - Minimal Recovery", "POOR_RESTO")
-            strategy = "Minimal restoration, significant deficiencies remain"
+    thresholds, levels = (_RETROFITTING_LADDER if repair_type == 'retrofitting'
+                          else _RESTORATION_LADDER)
+    # A NaN score lands on the lowest level, as no threshold is reached
+    level = 0 if math.isnan(overall) else bisect_right(thresholds, overall)
+    interpretation, interpretation_code, strategy = levels[level]
     
     # Per-mode analysis
     per_mode = []
@@ -308,7 +394,7 @@ def calculate_improved_repair_quality(
         per_mode.append({
             "mode": i + 1,
             "frequency_recovery": float(Q_freq_i[i]),
-            "mac_value": float(Q_shape_i[i] if i < len(Q_shape_i) else 0.0),
+            "mac_value": float(Q_shape_i[i]),
             "damping_recovery": float(Q_damp_i[i]),
             "strengthening_pct": float(((fR_arr[i] - fO_arr[i]) / fO_arr[i]) * 100)
         })
@@ -323,8 +409,8 @@ def calculate_improved_repair_quality(
             strengthening_factor=strengthening_factor
         ),
         per_mode_analysis=per_mode,
-        interpretation=interp[0],
-        interpretation_code=interp[1],
+        interpretation=interpretation,
+        interpretation_code=interpretation_code,
         confidence_level="high" if len(fO) >= 3 else "medium" if len(fO) == 2 else "low",
         repair_strategy=strategy
     )
@@ -11,19 +11,43 @@ import numpy as np
 from typing import Dict, Tuple, Optional
 from pathlib import Path
 from datetime import datetime
+import hashlib
 import json
+import math
+import os
+import pickle
+import platform
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from functools import lru_cache
 
 # Try to import joblib for model persistence
 try:
     import joblib
+    from joblib import Parallel, delayed
     JOBLIB_AVAILABLE = True
 except ImportError:
     JOBLIB_AVAILABLE = False
     print("⚠ joblib not available - model persistence will be limited")
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# LZ4 decompresses at near memory speed; zlib is the stdlib fallback
+try:
+    import lz4  # noqa: F401 - enables joblib's lz4 compressor
+    JOBLIB_COMPRESS = ('lz4', 3)
+except ImportError:
+    JOBLIB_COMPRESS = ('zlib', 3)
+
 # Sklearn for Isolation Forest
 from sklearn.ensemble import IsolationForest
-from sklearn.preprocessing import StandardScaler
+from sklearn.ensemble._iforest import _average_path_length
 
 # TensorFlow for Autoencoder (with fallback to sklearn if not available)
 try:
@@ -35,10 +59,311 @@ except ImportError:
     TENSORFLOW_AVAILABLE = False
     print("⚠ TensorFlow not available, Autoencoder will be disabled")
 
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+# Keras dtype policy for the autoencoder's hidden layers: bfloat16 compute
+# with float32 weights (bf16 keeps float32's range, so no loss scaling)
+AE_PRECISION_POLICY = 'mixed_bfloat16'
+
+# Batch sizes the XLA-compiled autoencoder is warmed up on (XLA compiles
+# per input shape): single-sample checks and a typical micro-batch
+AE_WARMUP_BATCH_SIZES = (1, 32)
+
+# Up to this many rows the autoencoder runs as a plain NumPy matmul chain;
+# larger batches amortize the TensorFlow call overhead
+NUMPY_AE_MAX_BATCH = 256
+
+# Micro-batching for predict_async: coalesce up to this many requests,
+# waiting at most this long (seconds) for the batch to fill
+MICRO_BATCH_MAX_REQUESTS = 64
+MICRO_BATCH_MAX_WAIT = 0.002
+
+# predict_fast: trees always evaluated before the early-exit test, and the
+# allowed probability that stopping early flips the full-forest decision
+EARLY_EXIT_MIN_TREES = 8
+EARLY_EXIT_DELTA = 0.01
+
+# Below this many rows, thread fan-out costs more than it saves
+PARALLEL_SCORE_MIN_SAMPLES = 2000
+
+# Distinct single-sample predictions remembered per hybrid detector
+SCORE_CACHE_SIZE = 4096
+
+
+def _available_cpus() -> int:
+    """Number of CPUs this process may run on."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _best_time(fn, repeats: int = 3) -> float:
+    """Fastest wall-clock time of a few calls to fn."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _feature_digest(data: bytes) -> bytes:
+    """64-bit hash of raw feature bytes (xxh3 when available, else BLAKE2b)."""
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_64(data).digest()
+    return hashlib.blake2b(data, digest_size=8).digest()
+
+
+class _SampleKey:
+    """Hashable key for one feature vector: hashed by digest, compared by bytes."""
+    
+    __slots__ = ('dtype', 'data', '_hash')
+    
+    def __init__(self, features: np.ndarray):
+        self.dtype = features.dtype.str
+        self.data = features.tobytes()
+        self._hash = hash(_feature_digest(self.data))
+    
+    def __hash__(self) -> int:
+        return self._hash
+    
+    def __eq__(self, other) -> bool:
+        return self.dtype == other.dtype and self.data == other.data
+    
+    def features(self) -> np.ndarray:
+        return np.frombuffer(self.data, dtype=self.dtype).reshape(1, -1)
+
+
+def _sigmoid_numpy(x: np.ndarray) -> np.ndarray:
+    """1 / (1 + exp(-x)) with a single temporary."""
+    out = np.exp(np.negative(x))
+    out += 1.0
+    return np.reciprocal(out, out=out)
+
+
+def _exp_score_numpy(x: np.ndarray) -> np.ndarray:
+    """1 - exp(-x), computed as -expm1(-x) with a single temporary."""
+    out = np.expm1(np.negative(x))
+    return np.negative(out, out=out)
+
+
+# The kernels below are compiled per process, not cached on disk: numba's
+# cache records the name the module was imported under, and a cache written
+# as 'anomaly_detector' breaks 'ml_models.anomaly_detector' (and vice versa)
+if NUMBA_AVAILABLE:
+    @njit(fastmath=True)
+    def _sigmoid(x):
+        """Same as _sigmoid_numpy as one fused loop"""
+        out = np.empty(x.shape[0])
+        for i in range(x.shape[0]):
+            out[i] = 1.0 / (1.0 + math.exp(-x[i]))
+        return out
+    
+    @njit(fastmath=True)
+    def _exp_score(x):
+        """Same as _exp_score_numpy as one fused loop"""
+        out = np.empty(x.shape[0])
+        for i in range(x.shape[0]):
+            out[i] = -math.expm1(-x[i])
+        return out
+    
+    @njit(parallel=True)
+    def _forest_score_samples(X, feature, threshold, left, right, leaf_depth, roots, denominator):
+        """
+        IsolationForest.score_samples over a packed forest.
+        
+        Each sample walks every tree (children index -1 marks a leaf) and
+        accumulates the leaf's path length, exactly as sklearn does.
+        """
+        n_samples = X.shape[0]
+        out = np.empty(n_samples)
+        for s in prange(n_samples):
+            depth = 0.0
+            for t in range(roots.shape[0]):
+                node = roots[t]
+                while left[node] != -1:
+                    if X[s, feature[node]] <= threshold[node]:
+                        node = left[node]
+                    else:
+                        node = right[node]
+                depth += leaf_depth[node]
+            out[s] = -(2.0 ** (-depth / denominator)) if denominator != 0 else -1.0
+        return out
+    
+    @njit
+    def _forest_flags_early_exit(X, feature, threshold, left, right, leaf_depth, roots,
+                                 order, depth_cut, spread, min_trees):
+        """
+        Per-sample "mean leaf depth < depth_cut" decisions with early exit.
+        
+        Trees are visited in `order`; after min_trees, a sample stops as soon
+        as the Hoeffding interval mean ± spread/sqrt(n) lies entirely on one
+        side of depth_cut.
+        """
+        n_samples = X.shape[0]
+        n_trees = order.shape[0]
+        out = np.empty(n_samples, dtype=np.bool_)
+        for s in range(n_samples):
+            total = 0.0
+            mean = 0.0
+            for k in range(n_trees):
+                node = roots[order[k]]
+                while left[node] != -1:
+                    if X[s, feature[node]] <= threshold[node]:
+                        node = left[node]
+                    else:
+                        node = right[node]
+                total += leaf_depth[node]
+                n = k + 1
+                mean = total / n
+                if n >= min_trees:
+                    margin = spread / math.sqrt(n)
+                    if mean - margin > depth_cut or mean + margin < depth_cut:
+                        break
+            out[s] = mean < depth_cut
+        return out
+else:
+    _sigmoid = _sigmoid_numpy
+    _exp_score = _exp_score_numpy
+
+
+class Float32Scaler:
+    """
+    Minimal float32 standardizer (same statistics as sklearn's StandardScaler).
+    
+    Features stay float32 end to end: IsolationForest builds float32 trees
+    and Keras consumes float32, so float64 scaling only doubles the bytes
+    moved.
+    """
+    
+    def __init__(self):
+        self.mean_ = None
+        self.scale_ = None
+    
+    def fit(self, features: np.ndarray) -> 'Float32Scaler':
+        """Compute per-feature mean and standard deviation."""
+        features = np.ascontiguousarray(features, dtype=np.float32)
+        self.mean_ = features.mean(axis=0, dtype=np.float32)
+        self.scale_ = features.std(axis=0, dtype=np.float32)
+        # Constant features are left unscaled, as StandardScaler does
+        self.scale_[self.scale_ < 10 * np.finfo(np.float32).eps] = 1.0
+        return self
+    
+    def transform(self, features: np.ndarray) -> np.ndarray:
+        """Standardize features to float32."""
+        return _apply_scaler(features, *_scaler_stats(self))
+    
+    def fit_transform(self, features: np.ndarray) -> np.ndarray:
+        """Fit, then standardize the same features."""
+        return self.fit(features).transform(features)
+
+
+def _pack_forest(model: IsolationForest) -> Optional[Tuple]:
+    """
+    Flatten a fitted IsolationForest into contiguous per-node arrays.
+    
+    sklearn keeps one Tree object per estimator; packing every tree's
+    feature/threshold/children arrays end to end (children re-based to
+    global node ids) lets one compiled kernel traverse the whole forest.
+    Leaf values fold in sklearn's depth + average-path-length correction.
+    
+    Returns:
+        Arguments for _forest_score_samples after X, or None when the
+        model doesn't expose the per-tree path lengths (older sklearn).
+    """
+    path_lengths = getattr(model, '_decision_path_lengths', None)
+    avg_path_lengths = getattr(model, '_average_path_length_per_tree', None)
+    if path_lengths is None or avg_path_lengths is None:
+        return None
+    
+    # Trees only see a column subset when max_features < n_features
+    subsample_features = model._max_features != model.n_features_in_
+    
+    features, thresholds, lefts, rights, leaf_depths, roots = [], [], [], [], [], []
+    offset = 0
+    for estimator, columns, decision_lengths, avg_lengths in zip(
+            model.estimators_, model.estimators_features_, path_lengths, avg_path_lengths):
+        tree = estimator.tree_
+        feature = tree.feature.astype(np.int64)
+        if subsample_features:
+            feature = np.asarray(columns)[np.maximum(feature, 0)]
+        # Leaves carry feature -2; clamp so the array stays a valid index
+        features.append(np.maximum(feature, 0))
+        thresholds.append(tree.threshold)
+        lefts.append(np.where(tree.children_left >= 0, tree.children_left + offset, -1))
+        rights.append(np.where(tree.children_right >= 0, tree.children_right + offset, -1))
+        leaf_depths.append(decision_lengths + avg_lengths - 1.0)
+        roots.append(offset)
+        offset += tree.node_count
+    
+    denominator = len(model.estimators_) * float(_average_path_length([model._max_samples])[0])
+    return (
+        np.concatenate(features).astype(np.int32),
+        np.concatenate(thresholds).astype(np.float64),
+        np.concatenate(lefts).astype(np.int32),
+        np.concatenate(rights).astype(np.int32),
+        np.concatenate(leaf_depths).astype(np.float64),
+        np.asarray(roots, dtype=np.int32),
+        denominator,
+    )
+
+
+# Names of _pack_forest's array outputs (the scalar denominator follows them)
+FOREST_ARRAYS = ('feature', 'threshold', 'left', 'right', 'leaf_depth', 'roots')
+
+
+def _scaler_stats(scaler) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    float32 (mean, 1/scale) of a fitted scaler for the inline transform.
+    
+    Accepts a Float32Scaler or the sklearn StandardScaler saved by older
+    models.
+    """
+    return (np.asarray(scaler.mean_, dtype=np.float32),
+            (1.0 / np.asarray(scaler.scale_, dtype=np.float32)))
+
+
+def _apply_scaler(features: np.ndarray, mean: np.ndarray, inv_scale: np.ndarray) -> np.ndarray:
+    """
+    Standardize features to float32 without sklearn's validation and copying.
+    
+    Produces float32, which both IsolationForest and Keras consume natively.
+    """
+    scaled = np.subtract(features, mean, dtype=np.float32)
+    scaled *= inv_scale
+    return scaled
+
+
+def _without_dropout(model):
+    """
+    Inference twin of a layer-chain Keras model with the Dropout layers removed.
+    
+    The remaining layers are reused, so weights stay shared with the model.
+    """
+    inputs = keras.Input(shape=model.input_shape[1:])
+    x = inputs
+    for layer in model.layers:
+        if isinstance(layer, (layers.InputLayer, layers.Dropout)):
+            continue
+        x = layer(x)
+    return keras.Model(inputs, x)
+
 
 class IsolationForestAnomalyDetector:
     """Fast statistical anomaly detection using Isolation Forest."""
     
+    CONFIDENCE = 0.8
+    
     def __init__(self, contamination: float = 0.1):
         """
         Initialize Isolation Forest.
@@ -47,12 +372,22 @@ class IsolationForestAnomalyDetector:
             contamination: Expected proportion of anomalies (0.0-1.0)
         """
         self.contamination = contamination
+        # 64 trees on 256-sample subsets: scores stabilize well before 100
+        # trees, and the subsample caps tree depth at ~log2(256) = 8
         self.model = IsolationForest(
             contamination=contamination,
             random_state=42,
-            n_estimators=100
+            n_estimators=64,
+            max_samples=256,
+            bootstrap=False,
+            n_jobs=-1
         )
-        self.scaler = StandardScaler()
+        self.scaler = Float32Scaler()
+        self._scale_stats = None
+        # Packed copy of the fitted trees for the compiled scoring kernels,
+        # plus predict_fast's (tree visiting order, Hoeffding spread)
+        self._forest = None
+        self._early_exit = None
         self.is_trained = False
     
     def train(self, features: np.ndarray) -> None:
@@ -64,11 +399,30 @@ class IsolationForestAnomalyDetector:
         """
         # Normalize features
         features_scaled = self.scaler.fit_transform(features)
+        self._scale_stats = _scaler_stats(self.scaler)
         
-        # Train model
+        self._fit_scaled(features_scaled)
+    
+    def _fit_scaled(self, features_scaled: np.ndarray) -> None:
+        """Train the model on features already scaled by self.scaler."""
         self.model.fit(features_scaled)
+        self._pack()
         self.is_trained = True
     
+    def _pack(self, forest: Optional[Tuple] = None) -> None:
+        """Pack the fitted forest for the numba kernels (no-op without numba)."""
+        if forest is None and NUMBA_AVAILABLE:
+            forest = _pack_forest(self.model)
+        self._forest = forest if NUMBA_AVAILABLE else None
+        self._early_exit = None
+        if self._forest is not None:
+            _, _, left, _, leaf_depth, roots, _ = self._forest
+            leaf_values = leaf_depth[left == -1]
+            # Hoeffding: |mean_n - mean| <= R * sqrt(ln(2/delta) / (2n))
+            spread = (leaf_values.max() - leaf_values.min()) * math.sqrt(math.log(2.0 / EARLY_EXIT_DELTA) / 2.0)
+            order = np.random.default_rng(42).permutation(len(roots)).astype(np.int32)
+            self._early_exit = (order, float(spread))
+    
     def predict(self, features: np.ndarray) -> Tuple[float, float]:
         """
         Predict anomaly score for new features.
@@ -89,20 +443,89 @@ class IsolationForestAnomalyDetector:
             features = features.reshape(1, -1)
         
         # Normalize
-        features_scaled = self.scaler.transform(features)
+        features_scaled = self._transform(features)
         
-        # Get anomaly scores (-1 for anomalies, 1 for normal)
-        predictions = self.model.predict(features_scaled)
-        scores = self.model.score_samples(features_scaled)
+        anomaly_scores = self._score_samples(features_scaled)
         
-        # Convert to [0, 1] scale
+        return float(anomaly_scores.mean()), self.CONFIDENCE
+    
+    def _transform(self, features: np.ndarray) -> np.ndarray:
+        """Scale a 2-D batch with the cached scaler statistics."""
+        return _apply_scaler(features, *self._scale_stats)
+    
+    def _score_samples(self, features_scaled: np.ndarray) -> np.ndarray:
+        """Per-sample anomaly scores in [0, 1] for an already-scaled 2-D batch."""
+        # Raw anomaly scores (lower = more anomalous); a binary decision, if
+        # ever needed, is scores < self.model.offset_ without a second pass
+        scores = self._raw_scores(features_scaled)
+        
+        # Convert to [0, 1] scale with a sigmoid
         # Isolation Forest scores are typically in [-0.5, 0.5]
-        anomaly_scores = 1.0 / (1.0 + np.exp(-scores))  # Sigmoid
+        return _sigmoid(scores)
+    
+    def predict_fast(self, features: np.ndarray, threshold: Optional[float] = None) -> np.ndarray:
+        """
+        Per-sample anomaly flags (raw score below threshold), stopping early.
+        
+        For callers that only need the boolean decision. Each sample walks
+        the trees in a fixed random order and stops once a Hoeffding bound
+        shows the remaining trees are unlikely (probability < EARLY_EXIT_DELTA)
+        to change the outcome.
+        
+        Args:
+            features: Feature vector (num_features,) or batch (num_samples, num_features)
+            threshold: Cut on the raw IsolationForest.score_samples scale
+                (lower = more anomalous); defaults to the fitted model's
+                offset_, i.e. the decision of IsolationForest.predict
+            
+        Returns:
+            Boolean array with one flag per sample (True = anomaly)
+        """
+        if features.ndim == 1:
+            features = features.reshape(1, -1)
+        n_samples = features.shape[0]
+        if not self.is_trained:
+            return np.zeros(n_samples, dtype=bool)
+        
+        if threshold is None:
+            threshold = float(self.model.offset_)
+        # Raw scores lie in [-1, 0)
+        if threshold <= -1.0:
+            return np.zeros(n_samples, dtype=bool)
+        if threshold >= 0.0:
+            return np.ones(n_samples, dtype=bool)
         
-        avg_score = np.mean(anomaly_scores)
-        confidence = 0.8  # Isolation Forest confidence
+        features_scaled = self._transform(features)
+        if self._forest is None:
+            return self._raw_scores(features_scaled) < threshold
         
-        return float(avg_score), float(confidence)
+        # score = -2 ** (-mean_depth / c), so
+        # score < threshold  <=>  mean_depth < -c * log2(-threshold)
+        denominator = self._forest[-1]
+        roots = self._forest[5]
+        c = denominator / len(roots)
+        depth_cut = -c * math.log2(-threshold)
+        order, spread = self._early_exit
+        return _forest_flags_early_exit(
+            np.ascontiguousarray(features_scaled, dtype=np.float32), *self._forest[:-1],
+            order, depth_cut, spread, EARLY_EXIT_MIN_TREES
+        )
+    
+    def _raw_scores(self, features_scaled: np.ndarray) -> np.ndarray:
+        """score_samples via the packed-forest kernel, else sklearn (threaded for large batches)."""
+        if self._forest is not None:
+            return _forest_score_samples(np.ascontiguousarray(features_scaled, dtype=np.float32),
+                                         *self._forest)
+        
+        n_jobs = _available_cpus()
+        if not JOBLIB_AVAILABLE or n_jobs < 2 or len(features_scaled) < PARALLEL_SCORE_MIN_SAMPLES:
+            return self.model.score_samples(features_scaled)
+        
+        # Tree traversal releases the GIL, so threads avoid pickling the forest
+        chunks = np.array_split(features_scaled, n_jobs)
+        return np.concatenate(Parallel(n_jobs=n_jobs, prefer='threads')(
+            delayed(self.model.score_samples)(chunk) for chunk in chunks
+        ))
     
     def save(self, filepath: Path) -> None:
         """Save model to disk."""
@@ -116,10 +539,19 @@ class IsolationForestAnomalyDetector:
             'contamination': self.contamination,
             'is_trained': self.is_trained
         }
-        joblib.dump(data, filepath)
+        joblib.dump(data, filepath, compress=JOBLIB_COMPRESS, protocol=5)
+        
+        # Packed forest arrays go uncompressed so load() can memory-map them
+        if self._forest is not None:
+            joblib.dump(self._forest, str(filepath) + '.forest', protocol=5)
     
     def load(self, filepath: Path) -> None:
-        """Load model from disk."""
+        """
+        Load model from disk.
+        
+        The packed forest, when saved alongside, is memory-mapped read-only
+        rather than copied, so the .forest file must outlive this detector.
+        """
         if not JOBLIB_AVAILABLE:
             print("⚠ joblib not available - model not loaded")
             return
@@ -129,11 +561,20 @@ class IsolationForestAnomalyDetector:
         self.scaler = data['scaler']
         self.contamination = data['contamination']
         self.is_trained = data['is_trained']
+        if self.is_trained:
+            self._scale_stats = _scaler_stats(self.scaler)
+            forest_path = Path(str(filepath) + '.forest')
+            if NUMBA_AVAILABLE and forest_path.exists():
+                self._pack(joblib.load(forest_path, mmap_mode='r'))
+            else:
+                self._pack()
 
 
 class AutoencoderAnomalyDetector:
     """Deep learning anomaly detection using Autoencoder."""
     
+    CONFIDENCE = 0.85
+    
     def __init__(self, input_dim: int, hidden_dim: int = 32):
         """
         Initialize Autoencoder.
@@ -144,10 +585,20 @@ class AutoencoderAnomalyDetector:
         """
         self.input_dim = input_dim
         self.hidden_dim = hidden_dim
-        self.scaler = StandardScaler()
+        self.scaler = Float32Scaler()
+        self._scale_stats = None
         self.model = None
         self.is_trained = False
         
+        # Compiled Keras forward pass, plus a float16 TFLite copy of the
+        # trained model used for inference when it is the faster backend
+        self.inference_model = None
+        self._dense_weights = []
+        self._infer = None
+        self._tflite = None
+        self._tflite_content = None
+        self._use_tflite = False
+        
         if TENSORFLOW_AVAILABLE:
             self._build_model()
     
@@ -156,20 +607,25 @@ class AutoencoderAnomalyDetector:
         if not TENSORFLOW_AVAILABLE:
             return
         
+        # Hidden layers run under the mixed precision policy; it is set per
+        # layer rather than globally so other Keras users are unaffected
+        policy = AE_PRECISION_POLICY
+        
         # Encoder
         encoder_input = keras.Input(shape=(self.input_dim,))
-        encoded = layers.Dense(128, activation='relu')(encoder_input)
-        encoded = layers.Dropout(0.2)(encoded)
-        encoded = layers.Dense(64, activation='relu')(encoded)
-        encoded = layers.Dropout(0.2)(encoded)
-        encoded = layers.Dense(self.hidden_dim, activation='relu')(encoded)
+        encoded = layers.Dense(128, activation='relu', dtype=policy)(encoder_input)
+        encoded = layers.Dropout(0.2, dtype=policy)(encoded)
+        encoded = layers.Dense(64, activation='relu', dtype=policy)(encoded)
+        encoded = layers.Dropout(0.2, dtype=policy)(encoded)
+        encoded = layers.Dense(self.hidden_dim, activation='relu', dtype=policy)(encoded)
         
         # Decoder
-        decoded = layers.Dense(64, activation='relu')(encoded)
-        decoded = layers.Dropout(0.2)(decoded)
-        decoded = layers.Dense(128, activation='relu')(decoded)
-        decoded = layers.Dropout(0.2)(decoded)
-        decoded = layers.Dense(self.input_dim, activation='linear')(decoded)
+        decoded = layers.Dense(64, activation='relu', dtype=policy)(encoded)
+        decoded = layers.Dropout(0.2, dtype=policy)(decoded)
+        decoded = layers.Dense(128, activation='relu', dtype=policy)(decoded)
+        decoded = layers.Dropout(0.2, dtype=policy)(decoded)
+        # float32 output keeps the MSE loss numerically stable
+        decoded = layers.Dense(self.input_dim, activation='linear', dtype='float32')(decoded)
         
         # Full autoencoder
         self.model = keras.Model(encoder_input, decoded)
@@ -194,7 +650,13 @@ class AutoencoderAnomalyDetector:
         
         # Normalize features
         features_scaled = self.scaler.fit_transform(features)
+        self._scale_stats = _scaler_stats(self.scaler)
         
+        self._fit_scaled(features_scaled, epochs, validation_split)
+    
+    def _fit_scaled(self, features_scaled: np.ndarray, epochs: int = 50,
+                    validation_split: float = 0.2) -> None:
+        """Train the model on features already scaled by self.scaler."""
         # Train with early stopping
         early_stop = keras.callbacks.EarlyStopping(
             monitor='val_loss',
@@ -212,6 +674,7 @@ class AutoencoderAnomalyDetector:
         )
         
         self.is_trained = True
+        self._prepare_inference()
     
     def predict(self, features: np.ndarray) -> Tuple[float, float]:
         """
@@ -231,22 +694,139 @@ class AutoencoderAnomalyDetector:
             features = features.reshape(1, -1)
         
         # Normalize
-        features_scaled = self.scaler.transform(features)
+        features_scaled = self._transform(features)
         
-        # Reconstruct
-        reconstructed = self.model.predict(features_scaled, verbose=0)
+        anomaly_scores = self._score_samples(features_scaled)
         
-        # Compute reconstruction error
-        mse = np.mean((features_scaled - reconstructed) ** 2, axis=1)
+        return float(anomaly_scores.mean()), self.CONFIDENCE
+    
+    def _transform(self, features: np.ndarray) -> np.ndarray:
+        """Scale a 2-D batch with the cached scaler statistics."""
+        return _apply_scaler(features, *self._scale_stats)
+    
+    def _score_samples(self, features_scaled: np.ndarray) -> np.ndarray:
+        """Per-sample anomaly scores in [0, 1] for an already-scaled 2-D batch."""
+        # Reconstruction error per sample
+        mse = self._reconstruction_errors(features_scaled)
         
         # Convert MSE to [0, 1] anomaly score
         # Use exponential mapping: higher MSE → higher anomaly score
-        anomaly_scores = 1.0 - np.exp(-mse)
+        return _exp_score(mse)
+    
+    def _reconstruction_errors(self, features_scaled: np.ndarray) -> np.ndarray:
+        """Per-sample reconstruction MSE on the selected backend."""
+        if self._dense_weights and len(features_scaled) <= NUMPY_AE_MAX_BATCH:
+            return self._numpy_errors(features_scaled)
+        if self._use_tflite:
+            return self._tflite_errors(features_scaled)
+        return self._keras_errors(features_scaled)
+    
+    def _keras_errors(self, features_scaled: np.ndarray) -> np.ndarray:
+        """Reconstruction MSE computed inside the traced Keras graph."""
+        return self._infer(tf.convert_to_tensor(features_scaled, tf.float32)).numpy()
+    
+    def _numpy_errors(self, features_scaled: np.ndarray) -> np.ndarray:
+        """
+        Reconstruction MSE from the Dense weights alone.
+        
+        For a handful of rows the forward pass is a few tiny GEMMs, cheaper
+        than any TensorFlow dispatch.
+        """
+        x = np.asarray(features_scaled, dtype=np.float32)
+        activations = x
+        for weights, bias in self._dense_weights[:-1]:
+            activations = activations @ weights
+            activations += bias
+            np.maximum(activations, 0.0, out=activations)  # ReLU
+        weights, bias = self._dense_weights[-1]
+        diff = activations @ weights
+        diff += bias
+        np.subtract(x, diff, out=diff)
+        mse = np.einsum('ij,ij->i', diff, diff)
+        mse *= 1.0 / diff.shape[1]
+        return mse
+    
+    def _tflite_errors(self, features_scaled: np.ndarray) -> np.ndarray:
+        """Reconstruction MSE from the TFLite output, reduced without squaring a copy."""
+        diff = np.subtract(features_scaled, self._tflite_reconstruct(features_scaled), dtype=np.float32)
+        mse = np.einsum('ij,ij->i', diff, diff)
+        mse *= 1.0 / diff.shape[1]
+        return mse
+    
+    def _prepare_inference(self, tflite_content: Optional[bytes] = None) -> None:
+        """
+        Trace the inference function, build the TFLite copy and pick the backend.
+        
+        Args:
+            tflite_content: Previously converted TFLite model (skips conversion)
+        """
+        # Dropout is inert at inference, so serve from a copy of the graph
+        # without it (4 fewer ops per forward pass)
+        model = self.inference_model = _without_dropout(self.model)
+        
+        # float32 (kernel, bias) per Dense layer for the NumPy path: ReLU
+        # hidden layers and a linear output, as built by _build_model
+        self._dense_weights = [
+            tuple(w.astype(np.float32) for w in layer.get_weights())
+            for layer in model.layers if isinstance(layer, layers.Dense)
+        ]
+        
+        # model.predict sets up a tf.data pipeline and callbacks on every
+        # call; a traced call with a dynamic batch dimension traces once.
+        # The graph returns the per-sample MSE so the residual is never
+        # materialized on the NumPy side.
+        def errors(x):
+            return tf.reduce_mean(tf.square(x - model(x, training=False)), axis=1)
         
-        avg_score = np.mean(anomaly_scores)
-        confidence = 0.85
+        input_dim = model.input_shape[-1]
+        signature = [tf.TensorSpec([None, input_dim], tf.float32)]
+        try:
+            # XLA fuses each Dense matmul + bias + ReLU into one kernel
+            self._infer = tf.function(errors, input_signature=signature, jit_compile=True)
+            # Compile now so the first caller doesn't pay for it
+            for batch_size in AE_WARMUP_BATCH_SIZES:
+                self._infer(tf.zeros([batch_size, input_dim], tf.float32))
+        except Exception as e:
+            print(f"⚠ XLA compilation unavailable, using the standard graph: {e}")
+            self._infer = tf.function(errors, input_signature=signature)
+        
+        self._tflite = None
+        self._tflite_content = None
+        self._use_tflite = False
+        try:
+            if tflite_content is None:
+                converter = tf.lite.TFLiteConverter.from_keras_model(model)
+                converter.optimizations = [tf.lite.Optimize.DEFAULT]
+                converter.target_spec.supported_types = [tf.float16]
+                tflite_content = converter.convert()
+            self._tflite = tf.lite.Interpreter(model_content=tflite_content)
+            self._tflite.allocate_tensors()
+            self._tflite_content = tflite_content
+        except Exception as e:
+            print(f"⚠ TFLite conversion failed, using Keras inference: {e}")
+            self._tflite = None
+            return
         
-        return float(avg_score), float(confidence)
+        # float16 TFLite kernels reliably win on ARM; on x86 they may not,
+        # so time both backends once on a warm-up batch
+        if platform.machine().lower() in ('arm64', 'aarch64'):
+            self._use_tflite = True
+        else:
+            sample = np.zeros((32, self.model.input_shape[-1]), dtype=np.float32)
+            keras_time = _best_time(lambda: self._keras_errors(sample))
+            tflite_time = _best_time(lambda: self._tflite_errors(sample))
+            self._use_tflite = tflite_time < keras_time
+    
+    def _tflite_reconstruct(self, features_scaled: np.ndarray) -> np.ndarray:
+        """Forward pass through the TFLite interpreter, resizing to the batch."""
+        input_details = self._tflite.get_input_details()[0]
+        if input_details['shape'][0] != len(features_scaled):
+            self._tflite.resize_tensor_input(input_details['index'],
+                                             [len(features_scaled), input_details['shape'][1]])
+            self._tflite.allocate_tensors()
+        self._tflite.set_tensor(input_details['index'], np.asarray(features_scaled, dtype=np.float32))
+        self._tflite.invoke()
+        return self._tflite.get_tensor(self._tflite.get_output_details()[0]['index'])
     
     def save(self, filepath: Path) -> None:
         """Save model to disk."""
@@ -257,8 +837,12 @@ class AutoencoderAnomalyDetector:
         model_dir = Path(filepath).parent
         model_dir.mkdir(parents=True, exist_ok=True)
         
-        self.model.save(str(filepath) + '.h5')
-        joblib.dump(self.scaler, str(filepath) + '_scaler.pkl')
+        # Native Keras v3 archive (the legacy .h5 format is still loadable),
+        # plus the float16 TFLite model so loading can skip reconversion
+        self.model.save(str(filepath) + '.keras')
+        if self._tflite_content is not None:
+            Path(str(filepath) + '.tflite').write_bytes(self._tflite_content)
+        joblib.dump(self.scaler, str(filepath) + '_scaler.pkl', compress=JOBLIB_COMPRESS, protocol=5)
     
     def load(self, filepath: Path) -> None:
         """Load model from disk."""
@@ -267,9 +851,16 @@ class AutoencoderAnomalyDetector:
             return
         
         try:
-            self.model = keras.models.load_model(str(filepath) + '.h5')
+            keras_path = Path(str(filepath) + '.keras')
+            if not keras_path.exists():
+                keras_path = Path(str(filepath) + '.h5')
+            self.model = keras.models.load_model(str(keras_path))
             self.scaler = joblib.load(str(filepath) + '_scaler.pkl')
+            self._scale_stats = _scaler_stats(self.scaler)
             self.is_trained = True
+            
+            tflite_path = Path(str(filepath) + '.tflite')
+            self._prepare_inference(tflite_path.read_bytes() if tflite_path.exists() else None)
         except Exception as e:
             print(f"Error loading autoencoder: {e}")
 
@@ -292,8 +883,21 @@ class HybridAnomalyDetector:
         self.if_detector = IsolationForestAnomalyDetector(contamination)
         self.ae_detector = AutoencoderAnomalyDetector(input_dim) if TENSORFLOW_AVAILABLE else None
         
+        # One scaler shared by both detectors (fit and applied once)
+        self.scaler = Float32Scaler()
+        self._scale_stats = None
+        
         self.is_trained = False
         self.metadata = {}
+        
+        # predict_async request queue, drained by a lazily started worker
+        self._requests = queue.SimpleQueue()
+        self._batch_worker = None
+        self._batch_worker_lock = threading.Lock()
+        
+        # Single-sample predict() results, for streams of repeated samples;
+        # cleared whenever the scaler or the models change
+        self._score_cache = lru_cache(maxsize=SCORE_CACHE_SIZE)(self._predict_sample)
     
     def train(self, features: np.ndarray, name: str = "baseline") -> None:
         """
@@ -305,14 +909,22 @@ class HybridAnomalyDetector:
         """
         print(f"Training hybrid detector on {features.shape[0]} samples...")
         
+        # Scale once for both detectors
+        features_scaled = self.scaler.fit_transform(features)
+        self._share_scaler()
+        
         # Train Isolation Forest
-        self.if_detector.train(features)
+        self.if_detector._fit_scaled(features_scaled)
         
         # Train Autoencoder if available
         if self.ae_detector:
-            self.ae_detector.train(features)
+            if TENSORFLOW_AVAILABLE:
+                self.ae_detector._fit_scaled(features_scaled)
+            else:
+                print("⚠ TensorFlow not available, skipping autoencoder training")
         
         self.is_trained = True
+        self._score_cache.cache_clear()
         self.metadata = {
             'trained_at': datetime.now().isoformat(),
             'name': name,
@@ -339,20 +951,120 @@ class HybridAnomalyDetector:
                 'is_anomaly': False
             }
         
+        # Single samples go through the score cache (a copy, since callers
+        # may annotate the result); hashing a whole batch would rarely pay off
+        if features.ndim == 1:
+            return dict(self._score_cache(_SampleKey(features)))
+        
+        return self._combine(*self._score_batch(features))
+    
+    def _predict_sample(self, key: _SampleKey) -> Dict:
+        """Prediction for one cached sample (the score cache's miss path)."""
+        return self._combine(*self._score_batch(key.features()))
+    
+    def predict_async(self, features: np.ndarray) -> Future:
+        """
+        Queue a prediction to be scored together with other concurrent requests.
+        
+        Single-sample calls from many threads are coalesced into one batched
+        pass through both detectors, amortizing their per-call overhead.
+        
+        Args:
+            features: Feature vector or batch
+            
+        Returns:
+            Future resolving to the same dictionary predict() returns
+        """
+        future = Future()
+        if not self.is_trained:
+            future.set_result(self.predict(features))
+            return future
+        
+        batch = features.reshape(1, -1) if features.ndim == 1 else features
+        self._ensure_batch_worker()
+        self._requests.put((batch, future))
+        return future
+    
+    def _ensure_batch_worker(self) -> None:
+        """Start the micro-batching thread on first use."""
+        with self._batch_worker_lock:
+            if self._batch_worker is None:
+                self._batch_worker = threading.Thread(target=self._run_batches, daemon=True)
+                self._batch_worker.start()
+    
+    def _run_batches(self) -> None:
+        """Drain queued requests into micro-batches and resolve their futures."""
+        while True:
+            pending = [self._requests.get()]
+            deadline = time.monotonic() + MICRO_BATCH_MAX_WAIT
+            while len(pending) < MICRO_BATCH_MAX_REQUESTS:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    pending.append(self._requests.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            
+            try:
+                # Score all rows in one pass, then hand each request its slice
+                if_scores, ae_scores = self._score_batch(np.vstack([batch for batch, _ in pending]))
+                offsets = np.cumsum([len(batch) for batch, _ in pending])[:-1]
+                if_parts = np.split(if_scores, offsets) if if_scores is not None else [None] * len(pending)
+                ae_parts = np.split(ae_scores, offsets) if ae_scores is not None else [None] * len(pending)
+                for (_, future), if_part, ae_part in zip(pending, if_parts, ae_parts):
+                    future.set_result(self._combine(if_part, ae_part))
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+    
+    def _share_scaler(self) -> None:
+        """Cache the shared scaler's stats and hand it to both detectors."""
+        self._score_cache.cache_clear()
+        self._scale_stats = _scaler_stats(self.scaler)
+        for detector in (self.if_detector, self.ae_detector):
+            if detector:
+                detector.scaler = self.scaler
+                detector._scale_stats = self._scale_stats
+    
+    def _score_batch(self, batch: np.ndarray) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """Per-sample (IF, AE) scores for a 2-D batch; None where a detector can't score."""
+        batch_scaled = _apply_scaler(batch, *self._scale_stats)
+        
+        if_scores = None
+        if self.if_detector.is_trained:
+            if_scores = self.if_detector._score_samples(batch_scaled)
+        
+        ae_scores = None
+        if self.ae_detector and TENSORFLOW_AVAILABLE and self.ae_detector.is_trained:
+            ae_scores = self.ae_detector._score_samples(batch_scaled)
+        
+        return if_scores, ae_scores
+    
+    def _combine(self, if_scores: Optional[np.ndarray], ae_scores: Optional[np.ndarray]) -> Dict:
+        """Build the prediction dictionary from per-sample detector scores."""
         # Isolation Forest prediction
-        if_score, if_conf = self.if_detector.predict(features)
+        if if_scores is not None:
+            if_score, if_conf = float(if_scores.mean()), self.if_detector.CONFIDENCE
+        else:
+            if_score, if_conf = 0.5, 0.0
         
         # Autoencoder prediction (if available)
-        if self.ae_detector and TENSORFLOW_AVAILABLE:
-            ae_score, ae_conf = self.ae_detector.predict(features)
-            has_ae = True
+        has_ae = bool(self.ae_detector and TENSORFLOW_AVAILABLE)
+        if ae_scores is not None:
+            ae_score, ae_conf = float(ae_scores.mean()), self.ae_detector.CONFIDENCE
         else:
             ae_score, ae_conf = 0.5, 0.0
-            has_ae = False
         
-        # Ensemble score (weighted average)
+        # Ensemble score (weighted average), averaged per sample in place
         if has_ae:
-            ensemble_score = 0.5 * if_score + 0.5 * ae_score
+            if if_scores is not None and ae_scores is not None:
+                np.add(if_scores, ae_scores, out=if_scores)
+                if_scores *= 0.5
+                ensemble_score = float(if_scores.mean())
+            else:
+                ensemble_score = 0.5 * if_score + 0.5 * ae_score
             ensemble_conf = (if_conf + ae_conf) / 2
         else:
             ensemble_score = if_score
@@ -374,6 +1086,95 @@ class HybridAnomalyDetector:
             'has_autoencoder': has_ae
         }
     
+    def to_arrays(self) -> Tuple[Dict[str, np.ndarray], Dict]:
+        """
+        Flatten the trained detector into named arrays plus a JSON-able header.
+        
+        The inverse of load_arrays(), for writing all artifacts as one
+        bundle. The sklearn forest travels as a pickled byte array; its
+        packed copy, the scaler statistics and the autoencoder weights are
+        plain arrays.
+        """
+        arrays = {
+            'scaler_mean': np.asarray(self.scaler.mean_, dtype=np.float32),
+            'scaler_scale': np.asarray(self.scaler.scale_, dtype=np.float32),
+            'if_model': np.frombuffer(pickle.dumps(self.if_detector.model, protocol=5), dtype=np.uint8),
+        }
+        header = {
+            'input_dim': self.input_dim,
+            'contamination': self.contamination,
+            'if_trained': self.if_detector.is_trained,
+            'metadata': self.metadata,
+        }
+        
+        forest = self.if_detector._forest
+        if forest is not None:
+            arrays.update((f'forest_{name}', array) for name, array in zip(FOREST_ARRAYS, forest))
+            header['forest_denominator'] = forest[-1]
+        
+        ae = self.ae_detector
+        if ae is not None and ae.is_trained:
+            weights = ae.model.get_weights()
+            arrays.update((f'ae_weight_{i}', w) for i, w in enumerate(weights))
+            if ae._tflite_content is not None:
+                arrays['ae_tflite'] = np.frombuffer(ae._tflite_content, dtype=np.uint8)
+            header['ae_hidden_dim'] = ae.hidden_dim
+            header['ae_num_weights'] = len(weights)
+        
+        return arrays, header
+    
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], header: Dict) -> 'HybridAnomalyDetector':
+        """
+        Build a detector straight from the output of to_arrays().
+        
+        Skips __init__, which would construct (and with TensorFlow, compile)
+        a placeholder autoencoder only for load_arrays() to replace it.
+        """
+        detector = cls.__new__(cls)
+        detector.if_detector = IsolationForestAnomalyDetector(header['contamination'])
+        # An autoencoder-less bundle still gets the untrained placeholder
+        # __init__ would have made, so predictions match load_arrays()
+        detector.ae_detector = (AutoencoderAnomalyDetector(header['input_dim'])
+                                if TENSORFLOW_AVAILABLE and 'ae_hidden_dim' not in header else None)
+        detector._requests = queue.SimpleQueue()
+        detector._batch_worker = None
+        detector._batch_worker_lock = threading.Lock()
+        detector._score_cache = lru_cache(maxsize=SCORE_CACHE_SIZE)(detector._predict_sample)
+        detector.load_arrays(arrays, header)
+        return detector
+    
+    def load_arrays(self, arrays: Dict[str, np.ndarray], header: Dict) -> None:
+        """Restore the detector from the output of to_arrays()."""
+        self.input_dim = header['input_dim']
+        self.contamination = header['contamination']
+        
+        self.scaler = Float32Scaler()
+        self.scaler.mean_ = arrays['scaler_mean']
+        self.scaler.scale_ = arrays['scaler_scale']
+        
+        if_detector = self.if_detector
+        if_detector.contamination = self.contamination
+        if_detector.model = pickle.loads(arrays['if_model'])
+        if_detector.is_trained = header['if_trained']
+        if if_detector.is_trained:
+            forest = None
+            if 'forest_denominator' in header:
+                forest = tuple(arrays[f'forest_{name}'] for name in FOREST_ARRAYS)
+                forest += (header['forest_denominator'],)
+            if_detector._pack(forest)
+        
+        if TENSORFLOW_AVAILABLE and 'ae_hidden_dim' in header:
+            ae = self.ae_detector = AutoencoderAnomalyDetector(self.input_dim, header['ae_hidden_dim'])
+            ae.model.set_weights([arrays[f'ae_weight_{i}'] for i in range(header['ae_num_weights'])])
+            ae.is_trained = True
+            tflite = arrays.get('ae_tflite')
+            ae._prepare_inference(tflite.tobytes() if tflite is not None else None)
+        
+        self._share_scaler()
+        self.metadata = header['metadata']
+        self.is_trained = True
+    
     def save(self, model_dir: Path) -> None:
         """Save both models to directory."""
         model_dir = Path(model_dir)
@@ -386,9 +1187,18 @@ class HybridAnomalyDetector:
         if self.ae_detector:
             self.ae_detector.save(model_dir / 'ae_model')
         
+        # Save the shared scaler
+        if JOBLIB_AVAILABLE:
+            joblib.dump(self.scaler, model_dir / 'scaler.pkl', compress=JOBLIB_COMPRESS, protocol=5)
+        
         # Save metadata
-        with open(model_dir / 'metadata.json', 'w') as f:
-            json.dump(self.metadata, f, indent=2)
+        if ORJSON_AVAILABLE:
+            (model_dir / 'metadata.json').write_bytes(
+                orjson.dumps(self.metadata, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+            )
+        else:
+            with open(model_dir / 'metadata.json', 'w') as f:
+                json.dump(self.metadata, f, indent=2)
     
     def load(self, model_dir: Path) -> None:
         """Load both models from directory."""
@@ -398,12 +1208,24 @@ class HybridAnomalyDetector:
         self.if_detector.load(model_dir / 'if_model.pkl')
         
         # Load Autoencoder if available
-        if TENSORFLOW_AVAILABLE and (model_dir / 'ae_model.h5').exists():
+        if TENSORFLOW_AVAILABLE and ((model_dir / 'ae_model.keras').exists() or
+                                     (model_dir / 'ae_model.h5').exists()):
             self.ae_detector.load(model_dir / 'ae_model')
         
+        # Shared scaler; older model directories only have the per-detector
+        # scalers, which were fit on the same data
+        if JOBLIB_AVAILABLE and (model_dir / 'scaler.pkl').exists():
+            self.scaler = joblib.load(model_dir / 'scaler.pkl')
+        else:
+            self.scaler = self.if_detector.scaler
+        self._share_scaler()
+        
         # Load metadata
         if (model_dir / 'metadata.json').exists():
-            with open(model_dir / 'metadata.json', 'r') as f:
-                self.metadata = json.load(f)
+            if ORJSON_AVAILABLE:
+                self.metadata = orjson.loads((model_dir / 'metadata.json').read_bytes())
+            else:
+                with open(model_dir / 'metadata.json', 'r') as f:
+                    self.metadata = json.load(f)
         
         self.is_trained = True
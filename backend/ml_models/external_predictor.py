@@ -5,7 +5,10 @@ This module provides a bridge between the backend and the ml456_advanced models.
 """
 
 # CRITICAL: Set up path BEFORE any other imports
+import logging
+import os
 import sys
+import threading
 from pathlib import Path
 
 # Ensure ml456_advanced is in path before we import anything else
@@ -14,9 +17,94 @@ if ml456_path not in sys.path:
     sys.path.insert(0, ml456_path)
 
 import numpy as np
+from contextlib import contextmanager
 from typing import Dict, Optional
 import joblib
 
+# ONNX Runtime for single-sample Random Forest inference (sklearn fallback)
+try:
+    import onnxruntime
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+# Hummingbird compiles the forest to PyTorch tensor ops when ONNX is missing
+try:
+    from hummingbird.ml import convert as hummingbird_convert
+    HUMMINGBIRD_AVAILABLE = True
+except ImportError:
+    HUMMINGBIRD_AVAILABLE = False
+
+# LZ4 keeps a compressed checkpoint cheap to decompress (compress_checkpoint)
+try:
+    import lz4  # noqa: F401  (joblib's 'lz4' compressor backend)
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Protocol 2+ pickles start with PROTO; joblib's compressed files never do
+_PICKLE_MAGIC = b'\x80'
+
+
+def _is_compressed_checkpoint(path: Path) -> bool:
+    """Tell from the magic bytes whether joblib wrote the file compressed."""
+    with open(path, 'rb') as f:
+        return f.read(len(_PICKLE_MAGIC)) != _PICKLE_MAGIC
+
+
+def compress_checkpoint(path: Path, output: Optional[Path] = None) -> Optional[Path]:
+    """
+    Rewrite an uncompressed checkpoint LZ4-compressed (an offline step).
+    
+    Trades memory-mapped loading for a smaller file, for deployments where
+    cold disk reads dominate; loading never calls this. The result is
+    written to a temporary file and renamed over output (default: path in
+    place), so a concurrent reader never sees a partial file.
+    
+    Returns:
+        The written path, or None when the checkpoint is already
+        compressed or LZ4 is unavailable
+    """
+    if not LZ4_AVAILABLE or _is_compressed_checkpoint(path):
+        return None
+    
+    output = Path(output) if output is not None else path
+    tmp_path = output.with_name(f'{output.name}.{os.getpid()}.tmp')
+    try:
+        joblib.dump(joblib.load(path), tmp_path, compress=('lz4', 3))
+        os.replace(tmp_path, output)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return output
+
+
+@contextmanager
+def _ml456_import_shim(ml456_path: str):
+    """
+    Let imports inside the block resolve 'models' to ml456's package.
+    
+    Any previously cached 'models' modules are set aside on entry. On exit
+    the 'models' modules loaded or injected inside the block are dropped
+    and the saved ones put back.
+    """
+    def models_keys():
+        return [key for key in sys.modules if key == 'models' or key.startswith('models.')]
+    
+    saved = {key: sys.modules.pop(key) for key in models_keys()}
+    if ml456_path not in sys.path:
+        sys.path.insert(0, ml456_path)
+    try:
+        yield
+    finally:
+        for key in models_keys():
+            del sys.modules[key]
+        sys.modules.update(saved)
+
 
 class ExternalBaselinePredictor:
     """
@@ -34,6 +122,12 @@ class ExternalBaselinePredictor:
         self._ml456_advanced_path = Path('/home/itachi/ml456_advanced')
         self._local_ml456_path = Path(__file__).parent / 'ml456_checkpoints'
         self._load_attempted = False
+        self._load_lock = threading.Lock()
+        # Extracted feature counts already reported as mismatched
+        self._feature_counts_seen = set()
+        self._feature_counts_lock = threading.Lock()
+        self._ort_session = None
+        self._hb_model = None
         
         # Don't load models during __init__ - do it lazily on first use
         # This avoids import errors during app startup
@@ -49,8 +143,7 @@ class ExternalBaselinePredictor:
                 if model_path.exists():
                     print(f"✓ Using local ML456 models from: {self._local_ml456_path}")
                     # Load model directly without complex imports
-                    import joblib
-                    model_data = joblib.load(model_path)
+                    model_data = self._load_model_file(model_path)
                     # The pkl file contains a dict with 'model' key
                     self.model = model_data['model'] if isinstance(model_data, dict) else model_data
                     self.model_path = model_path
@@ -69,109 +162,6 @@ class ExternalBaselinePredictor:
                 print("⚠️  Also checked local path - models not available")
                 return
             
-            # ml456_advanced should already be in sys.path from module-level import
-            # But ensure it's there
-            ml456_path_str = str(ml456_advanced_path)
-            if ml456_path_str not in sys.path:
-                sys.path.insert(0, ml456_path_str)
-            
-            # Clear any cached 'models' module from backend before importing ml456's predictor
-            # This is needed because Python caches the first 'models' it finds
-            modules_to_clear = [key for key in sys.modules.keys() if key.startswith('models')]
-            backend_models_cache = {}
-            
-            # Save backend's models modules
-            for mod_key in modules_to_clear:
-                if mod_key in sys.modules:
-                    backend_models_cache[mod_key] = sys.modules[mod_key]
-                    del sys.modules[mod_key]
-            
-            try:
-                # Now import - Python will find ml456's models since cache is clear
-                from inference.baseline_predictor_realistic import RealisticBaselinePredictor
-                
-                # Success! Keep ml456's modules loaded but restore backend's under different names
-                for mod_key, mod_obj in backend_models_cache.items():
-                    # Put backend's modules back but with a different namespace to avoid conflicts
-                    if mod_key == 'models':
-                        sys.modules['backend_models'] = mod_obj
-                    elif mod_key.startswith('models.'):
-                        new_key = 'backend_' + mod_key
-                        sys.modules[new_key] = mod_obj
-                        
-            except ImportError as e:
-                print(f"⚠️  Could not import ml456_advanced predictor: {e}")
-                # Restore backend's models on failure
-                for mod_key, mod_obj in backend_models_cache.items():
-                    sys.modules[mod_key] = mod_obj
-                return
-            
-            # OLD CODE using importlib - keeping as fallback
-            import importlib.util
-            
-            # Load ml456's sklearn_model directly
-            sklearn_model_path = ml456_advanced_path / 'models' / 'sklearn_model.py'
-            spec = importlib.util.spec_from_file_location("ml456_sklearn_model", sklearn_model_path)
-            if spec and spec.loader:
-                sklearn_module = importlib.util.module_from_spec(spec)
-                sys.modules['ml456_sklearn_model'] = sklearn_module
-                spec.loader.exec_module(sklearn_module)
-            
-            # Load ml456's feature_extractor directly
-            feature_extractor_path = ml456_advanced_path / 'models' / 'feature_extractor.py'
-            spec = importlib.util.spec_from_file_location("ml456_feature_extractor", feature_extractor_path)
-            if spec and spec.loader:
-                feature_module = importlib.util.module_from_spec(spec)
-                sys.modules['ml456_feature_extractor'] = feature_module
-                spec.loader.exec_module(feature_module)
-            
-            # Create a proper fake 'models' package for ml456
-            import types
-            ml456_models_namespace = types.ModuleType('models')
-            ml456_models_namespace.sklearn_model = sklearn_module
-            ml456_models_namespace.feature_extractor = feature_module
-            ml456_models_namespace.__file__ = str(ml456_advanced_path / 'models' / '__init__.py')
-            ml456_models_namespace.__path__ = [str(ml456_advanced_path / 'models')]
-            
-            # Temporarily inject ml456's models namespace
-            original_models = sys.modules.get('models')
-            original_sklearn = sys.modules.get('models.sklearn_model')
-            original_feature = sys.modules.get('models.feature_extractor')
-            
-            sys.modules['models'] = ml456_models_namespace
-            sys.modules['models.sklearn_model'] = sklearn_module
-            sys.modules['models.feature_extractor'] = feature_module
-            
-            try:
-                # Now load the predictor - it will find our fake models namespace
-                predictor_path = ml456_advanced_path / 'inference' / 'baseline_predictor_realistic.py'
-                spec = importlib.util.spec_from_file_location("ml456_predictor", predictor_path)
-                if spec and spec.loader:
-                    predictor_module = importlib.util.module_from_spec(spec)
-                    sys.modules['ml456_predictor'] = predictor_module
-                    spec.loader.exec_module(predictor_module)
-                    RealisticBaselinePredictor = predictor_module.RealisticBaselinePredictor
-                else:
-                    print("⚠️  Could not load predictor spec")
-                    return
-            finally:
-                # Restore original models modules
-                if original_models:
-                    sys.modules['models'] = original_models
-                else:
-                    if 'models' in sys.modules:
-                        del sys.modules['models']
-                
-                if original_sklearn:
-                    sys.modules['models.sklearn_model'] = original_sklearn
-                elif 'models.sklearn_model' in sys.modules:
-                    del sys.modules['models.sklearn_model']
-                    
-                if original_feature:
-                    sys.modules['models.feature_extractor'] = original_feature
-                elif 'models.feature_extractor' in sys.modules:
-                    del sys.modules['models.feature_extractor']
-            
             # Check required files exist
             model_path = ml456_advanced_path / 'checkpoints' / 'advanced' / 'random_forest_model.pkl'
             feature_extractor_path = ml456_advanced_path / 'data' / 'processed' / 'feature_extractor.pkl'
@@ -184,12 +174,28 @@ class ExternalBaselinePredictor:
                 print(f"⚠️  Feature extractor not found: {feature_extractor_path}")
                 return
             
-            # Load the predictor - it expects the base directory
-            self.predictor = RealisticBaselinePredictor(model_dir=ml456_advanced_path)
+            # Import and build ml456's predictor with its 'models' package in
+            # place of any cached one
+            with _ml456_import_shim(str(ml456_advanced_path)):
+                try:
+                    from inference.baseline_predictor_realistic import RealisticBaselinePredictor
+                except ImportError as e:
+                    print(f"⚠️  Could not import ml456_advanced predictor: {e}")
+                    
+                    # Fall back to loading ml456's modules straight from their files
+                    RealisticBaselinePredictor = self._load_predictor_from_files(ml456_advanced_path)
+                    if RealisticBaselinePredictor is None:
+                        return
+                
+                # Load the predictor - it expects the base directory
+                self.predictor = RealisticBaselinePredictor(model_dir=ml456_advanced_path)
             
             self.model_path = model_path
             self.feature_extractor_path = feature_extractor_path
             self.is_loaded = True
+            self._prepare_onnx()
+            if self._ort_session is None:
+                self._prepare_hummingbird()
             
             print("✓ ML456 Advanced predictor loaded successfully")
             print(f"  Base Dir: {ml456_advanced_path}")
@@ -205,11 +211,146 @@ class ExternalBaselinePredictor:
             traceback.print_exc()
             self.is_loaded = False
     
+    def _load_model_file(self, model_path: Path):
+        """
+        Load a model pickle, memory-mapping it when it is uncompressed.
+        
+        An uncompressed checkpoint is opened with mmap_mode='r', so its
+        arrays are paged in by the OS instead of read and copied; joblib
+        can't map a compressed one, which is loaded normally. Nothing is
+        written next to the checkpoint.
+        """
+        mmap_mode = None if _is_compressed_checkpoint(model_path) else 'r'
+        return joblib.load(model_path, mmap_mode=mmap_mode)
+    
+    def _load_predictor_from_files(self, ml456_advanced_path: Path):
+        """
+        Load RealisticBaselinePredictor by executing ml456's module files directly.
+        
+        Fallback for when the regular import fails. Must be called inside
+        _ml456_import_shim, which undoes the 'models' entries injected here.
+        """
+        import importlib.util
+        
+        # Load ml456's sklearn_model directly
+        sklearn_model_path = ml456_advanced_path / 'models' / 'sklearn_model.py'
+        spec = importlib.util.spec_from_file_location("ml456_sklearn_model", sklearn_model_path)
+        if spec and spec.loader:
+            sklearn_module = importlib.util.module_from_spec(spec)
+            sys.modules['ml456_sklearn_model'] = sklearn_module
+            spec.loader.exec_module(sklearn_module)
+        
+        # Load ml456's feature_extractor directly
+        feature_extractor_path = ml456_advanced_path / 'models' / 'feature_extractor.py'
+        spec = importlib.util.spec_from_file_location("ml456_feature_extractor", feature_extractor_path)
+        if spec and spec.loader:
+            feature_module = importlib.util.module_from_spec(spec)
+            sys.modules['ml456_feature_extractor'] = feature_module
+            spec.loader.exec_module(feature_module)
+        
+        # Create a proper fake 'models' package for ml456
+        import types
+        ml456_models_namespace = types.ModuleType('models')
+        ml456_models_namespace.sklearn_model = sklearn_module
+        ml456_models_namespace.feature_extractor = feature_module
+        ml456_models_namespace.__file__ = str(ml456_advanced_path / 'models' / '__init__.py')
+        ml456_models_namespace.__path__ = [str(ml456_advanced_path / 'models')]
+        
+        # Point 'models' at ml456's modules; the enclosing _ml456_import_shim
+        # puts the previous ones back
+        sys.modules['models'] = ml456_models_namespace
+        sys.modules['models.sklearn_model'] = sklearn_module
+        sys.modules['models.feature_extractor'] = feature_module
+        
+        # Now load the predictor - it will find our fake models namespace
+        predictor_path = ml456_advanced_path / 'inference' / 'baseline_predictor_realistic.py'
+        spec = importlib.util.spec_from_file_location("ml456_predictor", predictor_path)
+        if spec and spec.loader:
+            predictor_module = importlib.util.module_from_spec(spec)
+            sys.modules['ml456_predictor'] = predictor_module
+            spec.loader.exec_module(predictor_module)
+            return predictor_module.RealisticBaselinePredictor
+        print("⚠️  Could not load predictor spec")
+        return None
+    
+    def _prepare_onnx(self):
+        """Convert the Random Forest to an ONNX Runtime session, cached as .onnx next to the pkl."""
+        if not ONNX_AVAILABLE:
+            return
+        
+        try:
+            onnx_path = self.model_path.with_suffix('.onnx')
+            if onnx_path.exists() and onnx_path.stat().st_mtime >= self.model_path.stat().st_mtime:
+                onnx_bytes = onnx_path.read_bytes()
+            else:
+                num_features = len(self.predictor.X_mean)
+                onnx_model = convert_sklearn(
+                    self.predictor.model,
+                    initial_types=[('X', FloatTensorType([None, num_features]))]
+                )
+                onnx_bytes = onnx_model.SerializeToString()
+                try:
+                    onnx_path.write_bytes(onnx_bytes)
+                except OSError:
+                    pass  # Read-only model directory: convert again on next load
+            
+            self._ort_session = onnxruntime.InferenceSession(onnx_bytes, providers=['CPUExecutionProvider'])
+            print(f"✓ Random Forest compiled to ONNX Runtime ({onnx_path.name})")
+        except Exception as e:
+            print(f"⚠️  ONNX conversion failed, using sklearn predict: {e}")
+            self._ort_session = None
+    
+    def _prepare_hummingbird(self):
+        """Compile the Random Forest to PyTorch tensor ops with Hummingbird."""
+        if not HUMMINGBIRD_AVAILABLE:
+            return
+        
+        try:
+            self._hb_model = hummingbird_convert(self.predictor.model, 'torch')
+            print("✓ Random Forest compiled with Hummingbird (torch)")
+        except Exception as e:
+            print(f"⚠️  Hummingbird conversion failed, using sklearn predict: {e}")
+            self._hb_model = None
+    
+    def _predict_model(self, features_norm: np.ndarray) -> np.ndarray:
+        """Model output for one normalized feature vector."""
+        X = features_norm.reshape(1, -1)
+        if self._ort_session is not None:
+            return self._ort_session.run(None, {'X': X.astype(np.float32)})[0][0]
+        if self._hb_model is not None:
+            return self._hb_model.predict(X.astype(np.float32))[0]
+        return self.predictor.model.predict(X)[0]
+    
+    def _fit_feature_count(self, features: np.ndarray) -> np.ndarray:
+        """Truncate or zero-pad features to the model's input size, reporting each size once."""
+        expected_features = len(self.predictor.X_mean)
+        actual_features = len(features)
+        
+        if actual_features not in self._feature_counts_seen:
+            with self._feature_counts_lock:
+                if actual_features not in self._feature_counts_seen:
+                    self._feature_counts_seen.add(actual_features)
+                    logger.debug("Feature extraction: %d features extracted, %d expected",
+                                 actual_features, expected_features)
+                    if actual_features > expected_features:
+                        logger.warning("Truncating features from %d to %d", actual_features, expected_features)
+                    elif actual_features < expected_features:
+                        logger.warning("Padding features from %d to %d", actual_features, expected_features)
+        
+        if actual_features > expected_features:
+            return features[:expected_features]
+        if actual_features < expected_features:
+            padded = np.zeros(expected_features, dtype=np.result_type(features, np.float64))
+            padded[:actual_features] = features
+            return padded
+        return features
+    
     def _ensure_loaded(self):
-        """Ensure models are loaded (lazy loading)."""
-        if not self._load_attempted:
-            self._load_attempted = True
-            self._load_external_models()
+        """Ensure models are loaded (lazy loading); concurrent callers wait for the same load."""
+        with self._load_lock:
+            if not self._load_attempted:
+                self._load_attempted = True
+                self._load_external_models()
     
     def predict(self, damaged_data: np.ndarray, return_details: bool = True) -> Dict:
         """
@@ -221,7 +362,8 @@ class ExternalBaselinePredictor:
             
         Returns:
             Dictionary with prediction results including:
-            - predicted_baseline: Predicted baseline data
+            - predicted_baseline: Predicted baseline data (ndarray; serialize
+              with orjson.OPT_SERIALIZE_NUMPY rather than .tolist())
             - confidence: Prediction confidence (0-1)
             - confidence_level: 'low', 'medium', 'high'
             - method: Prediction method used
@@ -247,10 +389,10 @@ class ExternalBaselinePredictor:
             if hasattr(self, 'model') and self.predictor == self:
                 # Simple local model - just return the damaged data as baseline
                 # This is a placeholder since we don't have feature extraction for local model
-                print("ℹ️  Using simplified local model prediction")
+                logger.debug("Using simplified local model prediction")
                 return {
                     'success': True,
-                    'predicted_baseline': damaged_data.tolist(),
+                    'predicted_baseline': np.ascontiguousarray(damaged_data),
                     'confidence': 0.35,
                     'confidence_level': 'low',
                     'method': 'local_model',
@@ -268,26 +410,14 @@ class ExternalBaselinePredictor:
             # Extract features using the predictor's feature extractor
             damaged_features = self.predictor.feature_extractor.extract_features(damaged_data)
             
-            # Get expected feature count
-            expected_features = len(self.predictor.X_mean)
-            actual_features = len(damaged_features)
-            
-            print(f"Feature extraction: {actual_features} features extracted, {expected_features} expected")
-            
-            # Truncate if needed
-            if actual_features > expected_features:
-                print(f"⚠️  Truncating features from {actual_features} to {expected_features}")
-                damaged_features = damaged_features[:expected_features]
-            elif actual_features < expected_features:
-                print(f"⚠️  Padding features from {actual_features} to {expected_features}")
-                padding = np.zeros(expected_features - actual_features)
-                damaged_features = np.concatenate([damaged_features, padding])
+            # Truncate or pad to the model's feature count
+            damaged_features = self._fit_feature_count(damaged_features)
             
             # Normalize features
             damaged_features_norm = (damaged_features - self.predictor.X_mean) / self.predictor.X_std
             
             # Predict using the model directly
-            baseline_features_norm = self.predictor.model.predict(damaged_features_norm.reshape(1, -1))[0]
+            baseline_features_norm = self._predict_model(damaged_features_norm)
             
             # Apply hybrid strategy (30% ML + 70% mean baseline)
             hybrid_features_norm = (
@@ -308,9 +438,9 @@ class ExternalBaselinePredictor:
             
             result = {
                 'success': True,
-                'predicted_baseline': predicted_baseline.tolist(),
-                'predicted_baseline_features': predicted_baseline_features.tolist(),
-                'damaged_features': damaged_features.tolist(),
+                'predicted_baseline': predicted_baseline,
+                'predicted_baseline_features': predicted_baseline_features,
+                'damaged_features': damaged_features,
                 'confidence': confidence,
                 'confidence_level': 'low',
                 'method': 'hybrid',
@@ -321,9 +451,7 @@ class ExternalBaselinePredictor:
             return result
             
         except Exception as e:
-            print(f"⚠️  ML prediction error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("ML prediction error")
             return {
                 'success': False,
                 'error': str(e),
@@ -363,13 +491,21 @@ class ExternalBaselinePredictor:
 
 # Global singleton instance
 _external_predictor = None
+_external_predictor_lock = threading.Lock()
 
 
 def get_external_predictor() -> ExternalBaselinePredictor:
-    """Get or create the global external predictor instance."""
+    """
+    Get or create the global external predictor instance.
+    
+    Creating it starts loading the models on a background thread, so the
+    first prediction usually finds them ready.
+    """
     global _external_predictor
-    if _external_predictor is None:
-        _external_predictor = ExternalBaselinePredictor()
+    with _external_predictor_lock:
+        if _external_predictor is None:
+            _external_predictor = ExternalBaselinePredictor()
+            threading.Thread(target=_external_predictor._ensure_loaded, daemon=True).start()
     return _external_predictor
 
 
@@ -8,8 +8,12 @@ Extracts both time-domain and frequency-domain features from sensor streams:
 - Temporal: Peak intervals, Energy decay
 """
 
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
-from scipy import signal, stats
+from scipy import fft, signal
 from typing import Dict, List, Tuple, Optional
 
 # Try to import pywt for wavelet features, with graceful fallback
@@ -20,6 +24,135 @@ except ImportError:
     PYWT_AVAILABLE = False
     print("⚠ PyWavelets (pywt) not available - wavelet features will be zeros")
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Sensor samples per extract_features_batch call in BatchFeatureExtractor:
+# enough windows to amortize per-call overhead while the Welch segment
+# buffers stay cache-sized
+BATCH_CHUNK_SAMPLES = 1 << 17
+
+
+def _time_domain_numpy(data: np.ndarray) -> np.ndarray:
+    """RMS, peak-to-peak, kurtosis, skewness, crest, shape and impulse factors over the last axis."""
+    n = data.shape[-1]
+    mean = np.mean(data, axis=-1, keepdims=True)
+    
+    # Peak-to-peak
+    ptp = np.max(data, axis=-1) - np.min(data, axis=-1)
+    
+    # Central moments, formed as scipy.stats does; the only two temporaries
+    centered = data - mean
+    centered_sq = centered * centered
+    m2 = np.mean(centered_sq, axis=-1)
+    m3 = np.vecdot(centered_sq, centered) / n
+    m4 = np.vecdot(centered_sq, centered_sq) / n
+    
+    # RMS from the same moments (mean square = variance + mean^2)
+    rms = np.sqrt(m2 + mean[..., 0] ** 2)
+    
+    with np.errstate(all='ignore'):
+        # (Near-)constant signals have no defined shape: NaN, like scipy
+        constant = m2 <= (np.finfo(m2.dtype).eps * mean[..., 0]) ** 2
+        
+        # Kurtosis (measure of impulsive events, Fisher definition)
+        kurtosis = np.where(constant, np.nan, m4 / m2 ** 2.0) - 3
+        
+        # Skewness
+        skewness = np.where(constant, np.nan, m3 / m2 ** 1.5)
+    
+    # |data| reuses the centered buffer
+    abs_data = np.abs(data, out=centered)
+    peak = np.max(abs_data, axis=-1)
+    mav = np.mean(abs_data, axis=-1)
+    
+    # Crest factor (peak / RMS)
+    crest = peak / (rms + 1e-10)
+    
+    # Shape factor (RMS / mean absolute value)
+    shape = rms / (mav + 1e-10)
+    
+    # Impulse factor (peak / mean absolute value)
+    impulse = peak / (mav + 1e-10)
+    
+    return np.stack([rms, ptp, kurtosis, skewness, crest, shape, impulse], axis=-1)
+
+
+if NUMBA_AVAILABLE:
+    # Compiled per process, not cached on disk: numba's cache records the
+    # module's import name, so a cache written as 'feature_extractor' breaks
+    # 'ml_models.feature_extractor'
+    @njit(nogil=True)
+    def _time_domain_kernel(data, eps, out):
+        """
+        Same as _time_domain_numpy for a (num_signals, N) array, in two
+        streaming passes per signal and no temporaries.
+        
+        Serial and GIL-free: BatchFeatureExtractor parallelizes across
+        threads, which numba's default workqueue layer can't host.
+        """
+        n = data.shape[1]
+        for s in range(data.shape[0]):
+            x = data[s]
+            
+            # Pass 1: raw sums and extremes
+            total = 0.0
+            total_abs = 0.0
+            peak = 0.0
+            lo = x[0]
+            hi = x[0]
+            for i in range(n):
+                v = x[i]
+                total += v
+                a = abs(v)
+                total_abs += a
+                peak = max(peak, a)
+                lo = min(lo, v)
+                hi = max(hi, v)
+            mean = total / n
+            
+            # Pass 2: central moments
+            c2 = 0.0
+            c3 = 0.0
+            c4 = 0.0
+            for i in range(n):
+                c = x[i] - mean
+                sq = c * c
+                c2 += sq
+                c3 += sq * c
+                c4 += sq * sq
+            m2 = c2 / n
+            
+            rms = math.sqrt(m2 + mean * mean)
+            mav = total_abs / n
+            out[s, 0] = rms
+            out[s, 1] = hi - lo
+            if m2 <= (eps * mean) ** 2:
+                out[s, 2] = np.nan
+                out[s, 3] = np.nan
+            else:
+                out[s, 2] = (c4 / n) / m2 ** 2.0 - 3
+                out[s, 3] = (c3 / n) / m2 ** 1.5
+            out[s, 4] = peak / (rms + 1e-10)
+            out[s, 5] = rms / (mav + 1e-10)
+            out[s, 6] = peak / (mav + 1e-10)
+    
+    def _time_domain(data: np.ndarray) -> np.ndarray:
+        """Same as _time_domain_numpy, via the compiled kernel."""
+        if data.shape[-1] == 0:
+            return _time_domain_numpy(data)
+        if data.dtype.kind != 'f':
+            data = data.astype(np.float64)
+        signals = np.ascontiguousarray(data.reshape(-1, data.shape[-1]))
+        out = np.empty((signals.shape[0], 7))
+        _time_domain_kernel(signals, np.finfo(data.dtype).eps, out)
+        return out.reshape(data.shape[:-1] + (7,))
+else:
+    _time_domain = _time_domain_numpy
+
 
 class FeatureExtractor:
     """Extract features from sensor data for ML models."""
@@ -61,6 +194,34 @@ class FeatureExtractor:
              for feat in self.wavelet_features] +
             ['rms_mean', 'rms_std', 'freq_mean', 'freq_std']  # Aggregated features
         )
+        
+        # Daubechies wavelet (db4) filters, built once
+        self._wavelet = pywt.Wavelet('db4') if PYWT_AVAILABLE else None
+        
+        # Frequency bands (Hz) reported as band energies
+        self.freq_bands = [(0, 5), (5, 50), (50, 200), (200, 450)]
+        
+        # Welch setup per segment length:
+        # {nperseg: (window, scale, freqs, spectral weights)}
+        self._welch_plans = {}
+    
+    @classmethod
+    def compile(cls, fs: float, num_sensors: int, window_size: int) -> 'FeatureExtractor':
+        """
+        Create an extractor ready for windows of one fixed shape.
+        
+        One warm-up window builds the Welch plan for that length and
+        compiles (or loads from cache) the numba kernels, so the first real
+        window pays no setup or JIT cost.
+        
+        Args:
+            fs: Sampling frequency (Hz)
+            num_sensors: Number of sensors
+            window_size: Samples per sensor in each window
+        """
+        extractor = cls(fs, num_sensors)
+        extractor.extract_features_array(np.zeros((num_sensors, window_size), dtype=np.float32))
+        return extractor
     
     def extract_features(self, sensor_data: Dict[int, np.ndarray]) -> np.ndarray:
         """
@@ -71,193 +232,215 @@ class FeatureExtractor:
             
         Returns:
             Feature vector (1D numpy array)
-        """
-        features = []
         
-        # Per-sensor features
+        Equal-length streams are stacked and passed to
+        extract_features_array(); callers holding a (num_sensors, N) array
+        can call that directly.
+        """
+        sensors = []
         for sensor_id in range(self.num_sensors):
             if sensor_id not in sensor_data:
                 # Log warning if sensor data is missing
                 print(f"Warning: Sensor {sensor_id} data not available in feature extraction")
                 continue
-            
-            data = sensor_data[sensor_id]
-            
-            # Time-domain features
-            time_feats = self._extract_time_domain(data)
-            features.extend(time_feats)
-            
-            # Frequency-domain features
-            freq_feats = self._extract_freq_domain(data)
-            features.extend(freq_feats)
-            
-            # Wavelet features
-            wav_feats = self._extract_wavelet(data)
-            features.extend(wav_feats)
+            sensors.append(sensor_data[sensor_id])
         
-        # Aggregated features (cross-sensor statistics)
-        agg_feats = self._extract_aggregated(sensor_data)
-        features.extend(agg_feats)
+        if len({len(data) for data in sensors}) == 1:
+            return self.extract_features_array(np.stack(sensors))
         
-        return np.array(features, dtype=np.float32)
-    
-    def _extract_time_domain(self, data: np.ndarray) -> List[float]:
-        """Extract time-domain features."""
+        # Ragged streams: one sensor at a time
+        time_feats = [self._extract_time_domain(data) for data in sensors]
+        freq_feats = [self._extract_freq_domain(data) for data in sensors]
+        wav_feats = [self._extract_wavelet(data) for data in sensors]
+        
+        # Per-sensor features: time, frequency, then wavelet
         features = []
+        for sensor_feats in zip(time_feats, freq_feats, wav_feats):
+            for feats in sensor_feats:
+                features.extend(feats)
         
-        # RMS
-        rms = np.sqrt(np.mean(data ** 2))
-        features.append(rms)
+        # Aggregated features (cross-sensor statistics of RMS and peak frequency)
+        agg_feats = self._extract_aggregated(np.array([feats[0] for feats in time_feats]),
+                                             np.array([feats[7] for feats in freq_feats]))
+        features.extend(agg_feats)
         
-        # Peak-to-peak
-        ptp = np.ptp(data)
-        features.append(ptp)
+        return np.array(features, dtype=np.float32)
+    
+    def extract_features_array(self, sensor_array: np.ndarray) -> np.ndarray:
+        """
+        Extract all features from sensor streams stored as one array.
         
-        # Kurtosis (measure of impulsive events)
-        kurtosis = stats.kurtosis(data)
-        features.append(kurtosis)
+        Args:
+            sensor_array: Shape (num_sensors, num_samples), one row per sensor
+            
+        Returns:
+            Feature vector (1D numpy array)
+        """
+        return self.extract_features_batch(np.asarray(sensor_array)[None])[0]
+    
+    def extract_features_batch(self, windows: np.ndarray) -> np.ndarray:
+        """
+        Extract features from many equal-length windows at once.
         
-        # Skewness
-        skewness = stats.skew(data)
-        features.append(skewness)
+        Args:
+            windows: Shape (num_windows, num_sensors, window_length)
+            
+        Returns:
+            Features array (num_windows, num_features), each row laid out as
+            extract_features() returns it
+        """
+        windows = np.ascontiguousarray(windows, dtype=np.float32)
+        time_feats = self._extract_time_domain(windows)
+        freq_feats = self._extract_freq_domain(windows)
+        wav_feats = self._extract_wavelet(windows)
         
-        # Crest factor (peak / RMS)
-        crest = np.max(np.abs(data)) / (rms + 1e-10)
-        features.append(crest)
+        # Per-sensor features: time, frequency, then wavelet
+        per_sensor = np.concatenate([time_feats, freq_feats, wav_feats], axis=-1)
         
-        # Shape factor (RMS / mean absolute value)
-        mav = np.mean(np.abs(data))
-        shape = rms / (mav + 1e-10)
-        features.append(shape)
+        # Aggregated features (cross-sensor statistics of RMS and peak frequency)
+        agg_feats = self._extract_aggregated(time_feats[..., 0], freq_feats[..., 7])
         
-        # Impulse factor (peak / mean absolute value)
-        impulse = np.max(np.abs(data)) / (mav + 1e-10)
-        features.append(impulse)
+        return np.concatenate(
+            [per_sensor.reshape(len(windows), -1), agg_feats], axis=-1
+        ).astype(np.float32)
+    
+    def _extract_time_domain(self, data: np.ndarray) -> np.ndarray:
+        """
+        Extract time-domain features.
         
-        return features
+        Reduces over the last axis, so a (num_sensors, N) stack gives one row
+        of features per sensor.
+        """
+        return _time_domain(np.asarray(data, dtype=np.float32))
     
-    def _extract_freq_domain(self, data: np.ndarray) -> List[float]:
-        """Extract frequency-domain features."""
-        features = []
+    def _extract_freq_domain(self, data: np.ndarray) -> np.ndarray:
+        """
+        Extract frequency-domain features.
+        
+        Reduces over the last axis, so a (num_sensors, N) stack gives one row
+        of features per sensor from a single Welch call.
+        """
+        data = np.asarray(data, dtype=np.float32)
         
         try:
             # Compute FFT
-            freqs, psd = signal.welch(data, fs=self.fs, nperseg=min(1024, len(data)))
+            nperseg = min(1024, data.shape[-1])
+            freqs, psd = self._welch(data, nperseg)
+            
+            # Centroid numerator and band energies as one product with the
+            # cached [freqs, band masks] weights
+            weighted = psd @ self._welch_plans[nperseg][3]
             
             # Spectral centroid (center of mass in frequency)
-            total_power = np.sum(psd)
-            if total_power > 0:
-                centroid = np.sum(freqs * psd) / total_power
-            else:
-                centroid = 0.0
-            features.append(centroid)
+            total_power = np.sum(psd, axis=-1)
+            has_power = total_power > 0
+            centroid = np.where(
+                has_power, weighted[..., 0] / np.where(has_power, total_power, 1.0), 0.0
+            )
             
             # Spectral entropy
-            psd_norm = psd / (total_power + 1e-10)
-            entropy = -np.sum(psd_norm * np.log(psd_norm + 1e-10))
-            features.append(entropy)
+            psd_norm = psd / (total_power[..., None] + 1e-10)
+            entropy = -np.sum(psd_norm * np.log(psd_norm + 1e-10), axis=-1)
             
             # Total spectral energy
             spectral_energy = total_power
-            features.append(spectral_energy)
-            
-            # Energy in frequency bands
-            band_0_5 = np.sum(psd[(freqs >= 0) & (freqs < 5)])
-            features.append(band_0_5)
-            
-            band_5_50 = np.sum(psd[(freqs >= 5) & (freqs < 50)])
-            features.append(band_5_50)
             
-            band_50_200 = np.sum(psd[(freqs >= 50) & (freqs < 200)])
-            features.append(band_50_200)
-            
-            band_200_450 = np.sum(psd[(freqs >= 200) & (freqs < 450)])
-            features.append(band_200_450)
+            # Energy in frequency bands (0-5, 5-50, 50-200, 200-450 Hz)
+            band_energies = weighted[..., 1:]
             
             # Peak frequency and power
-            peak_idx = np.argmax(psd)
-            peak_freq = freqs[peak_idx] if len(freqs) > 0 else 0.0
-            peak_power = psd[peak_idx] if len(psd) > 0 else 0.0
-            features.append(peak_freq)
-            features.append(peak_power)
+            peak_idx = np.argmax(psd, axis=-1)
+            peak_freq = freqs[peak_idx]
+            peak_power = np.take_along_axis(psd, peak_idx[..., None], axis=-1)[..., 0]
+            
+            return np.stack([
+                centroid, entropy, spectral_energy,
+                *np.moveaxis(band_energies, -1, 0),
+                peak_freq, peak_power
+            ], axis=-1)
             
         except Exception as e:
             print(f"Error in frequency domain extraction: {e}")
-            features.extend([0.0] * 9)  # 9 frequency features
+            return np.zeros(data.shape[:-1] + (9,))  # 9 frequency features
+    
+    def _welch(self, data: np.ndarray, nperseg: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Welch PSD over the last axis, equivalent to signal.welch's defaults.
+        
+        Hann window, 50% overlap, constant detrend, one-sided density
+        scaling; the window, scale and frequency bins (with the spectral
+        feature weights) are built once per segment length.
+        """
+        if nperseg not in self._welch_plans:
+            window = signal.get_window('hann', nperseg)
+            scale = float(1.0 / (self.fs * np.sum(window * window)))
+            freqs = np.fft.rfftfreq(nperseg, 1.0 / self.fs)
+            weights = np.column_stack(
+                [freqs] + [(freqs >= lo) & (freqs < hi) for lo, hi in self.freq_bands]
+            ).astype(np.float32)
+            window = window.astype(np.float32)
+            self._welch_plans[nperseg] = (window, scale, freqs, weights)
+        window, scale, freqs, _ = self._welch_plans[nperseg]
+        
+        # (..., num_segments, nperseg) view of the overlapping segments
+        segments = np.lib.stride_tricks.sliding_window_view(data, nperseg, axis=-1)[..., ::nperseg - nperseg // 2, :]
+        segments = segments - np.mean(segments, axis=-1, keepdims=True)
+        segments *= window
         
-        return features
+        # scipy.fft keeps float32 input in complex64 (np.fft upcasts)
+        spectrum = fft.rfft(segments, axis=-1)
+        psd = (spectrum.real ** 2 + spectrum.imag ** 2) * scale
+        
+        # One-sided: fold in the negative frequencies except DC (and Nyquist)
+        if nperseg % 2:
+            psd[..., 1:] *= 2
+        else:
+            psd[..., 1:-1] *= 2
+        
+        return freqs, np.mean(psd, axis=-2)
     
-    def _extract_wavelet(self, data: np.ndarray) -> List[float]:
-        """Extract wavelet-based features."""
-        features = []
+    def _extract_wavelet(self, data: np.ndarray) -> np.ndarray:
+        """
+        Extract wavelet-based features.
+        
+        Reduces over the last axis, so a (num_sensors, N) stack gives one row
+        of features per sensor from a single decomposition.
+        """
+        data = np.asarray(data, dtype=np.float32)
         
         try:
             if not PYWT_AVAILABLE:
                 # Return zeros if pywt is not available
-                return [0.0, 0.0, 0.0, 0.0]
+                return np.zeros(data.shape[:-1] + (4,))
             
-            # Use Daubechies wavelet (db4) for 3-level decomposition
-            wavelet = 'db4'
-            level = 3
-            
-            # Multi-level wavelet decomposition
-            coeffs = pywt.wavedec(data, wavelet, level=level)
+            # Multi-level wavelet decomposition (3 levels)
+            coeffs = pywt.wavedec(data, self._wavelet, level=3, axis=-1)
             
             # coeffs = [cA3, cD3, cD2, cD1]
             # Extract energy from each level
-            for i, coeff in enumerate(coeffs):
-                energy = np.sum(coeff ** 2)
-                features.append(energy)
-            
-            # Ensure we have exactly 4 features (A3, D3, D2, D1)
-            while len(features) < 4:
-                features.append(0.0)
+            return np.stack([np.sum(coeff ** 2, axis=-1) for coeff in coeffs], axis=-1)
             
         except Exception as e:
             print(f"Error in wavelet extraction: {e}")
-            features.extend([0.0] * 4)  # 4 wavelet features
-        
-        return features[:4]  # Take only first 4
+            return np.zeros(data.shape[:-1] + (4,))  # 4 wavelet features
     
-    def _extract_aggregated(self, sensor_data: Dict[int, np.ndarray]) -> List[float]:
-        """Extract aggregated cross-sensor features."""
-        features = []
-        
-        # Collect RMS from all sensors
-        rms_values = []
-        peak_freqs = []
-        
-        for sensor_id in range(self.num_sensors):
-            if sensor_id not in sensor_data:
-                continue
-            
-            data = sensor_data[sensor_id]
-            rms = np.sqrt(np.mean(data ** 2))
-            rms_values.append(rms)
-            
-            # Get peak frequency
-            try:
-                freqs, psd = signal.welch(data, fs=self.fs, nperseg=min(1024, len(data)))
-                peak_idx = np.argmax(psd)
-                peak_freqs.append(freqs[peak_idx])
-            except:
-                peak_freqs.append(0.0)
-        
-        # RMS statistics
-        if rms_values:
-            features.append(np.mean(rms_values))  # Mean RMS
-            features.append(np.std(rms_values))   # Std RMS
-        else:
-            features.extend([0.0, 0.0])
+    def _extract_aggregated(self, rms_values: np.ndarray, peak_freqs: np.ndarray) -> np.ndarray:
+        """
+        Extract aggregated cross-sensor features.
         
-        # Frequency statistics
-        if peak_freqs:
-            features.append(np.mean(peak_freqs))  # Mean peak freq
-            features.append(np.std(peak_freqs))   # Std peak freq
-        else:
-            features.extend([0.0, 0.0])
+        Args:
+            rms_values: Per-sensor RMS, shape (..., num_sensors)
+            peak_freqs: Per-sensor peak frequency, shape (..., num_sensors)
+        """
+        if rms_values.shape[-1] == 0:
+            return np.zeros(rms_values.shape[:-1] + (4,))
         
-        return features
+        return np.stack([
+            np.mean(rms_values, axis=-1),  # Mean RMS
+            np.std(rms_values, axis=-1),   # Std RMS
+            np.mean(peak_freqs, axis=-1),  # Mean peak freq
+            np.std(peak_freqs, axis=-1)    # Std peak freq
+        ], axis=-1)
     
     def get_feature_names(self) -> List[str]:
         """Get list of feature names."""
@@ -281,10 +464,10 @@ class BatchFeatureExtractor:
             num_sensors: Number of sensors
             window_size_sec: Duration of each feature window
         """
-        self.extractor = FeatureExtractor(fs, num_sensors)
         self.fs = fs
         self.num_sensors = num_sensors
         self.window_size = int(fs * window_size_sec)
+        self.extractor = FeatureExtractor.compile(fs, num_sensors, self.window_size)
     
     def extract_batch_features(self, data: np.ndarray) -> np.ndarray:
         """
@@ -298,22 +481,27 @@ class BatchFeatureExtractor:
         """
         num_samples = data.shape[0]
         num_windows = num_samples // self.window_size
+        if num_windows == 0:
+            return np.array([], dtype=np.float32)
         
-        features_list = []
+        # (num_windows, num_sensors, window_size), each sensor contiguous
+        windows = np.ascontiguousarray(
+            data[:num_windows * self.window_size, :self.num_sensors]
+            .reshape(num_windows, self.window_size, self.num_sensors)
+            .transpose(0, 2, 1),
+            dtype=np.float32
+        )
         
-        for window_idx in range(num_windows):
-            start_idx = window_idx * self.window_size
-            end_idx = start_idx + self.window_size
-            
-            window_data = data[start_idx:end_idx, :]
-            
-            # Convert to sensor dictionary format
-            sensor_dict = {}
-            for sensor_id in range(self.num_sensors):
-                sensor_dict[sensor_id] = window_data[:, sensor_id]
-            
-            # Extract features
-            features = self.extractor.extract_features(sensor_dict)
-            features_list.append(features)
+        # Extract features a chunk of windows at a time
+        chunk = max(1, BATCH_CHUNK_SAMPLES // windows[0].size)
+        chunks = [windows[start:start + chunk] for start in range(0, num_windows, chunk)]
+        
+        # The kernels release the GIL, so chunks run in parallel on threads;
+        # a lone chunk instead spreads its FFTs over the cores
+        num_workers = min(len(chunks), os.cpu_count() or 1)
+        if num_workers > 1:
+            with ThreadPoolExecutor(max_workers=num_workers) as pool:
+                return np.concatenate(list(pool.map(self.extractor.extract_features_batch, chunks)))
         
-        return np.array(features_list, dtype=np.float32)
+        with fft.set_workers(-1):
+            return np.concatenate([self.extractor.extract_features_batch(c) for c in chunks])
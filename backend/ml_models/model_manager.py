@@ -8,10 +8,19 @@ Handles:
 - Live model switching
 """
 
+import gc
+import importlib.util
+import io
 import json
+import math
+import os
+import re
+import threading
 from pathlib import Path
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional, Dict, List
+from functools import lru_cache
+from typing import Optional, Dict, List, Set, Tuple
 import numpy as np
 from dataclasses import dataclass, asdict
 import shutil
@@ -19,10 +28,149 @@ import shutil
 from .feature_extractor import FeatureExtractor, BatchFeatureExtractor
 from .anomaly_detector import HybridAnomalyDetector
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
-@dataclass
+# pandas' multi-threaded CSV parser; looked up without importing pyarrow
+PYARROW_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
+# Parsed info.json files remembered per manager
+INFO_CACHE_SIZE = 128
+
+# Longest a read (predict, is_model_loaded, ...) waits for the startup load
+INITIAL_LOAD_TIMEOUT = 30.0
+
+# Concurrent info.json reads in list_models (hides per-file latency on
+# network-backed model directories)
+LIST_IO_WORKERS = 32
+
+# Single-file detector artifact written by train_model (see _stage_bundle)
+BUNDLE_NAME = "detector.bundle"
+BUNDLE_ALIGNMENT = 64
+BUNDLE_WRITE_BUFFER = 4 << 20
+
+# Storage dtype of the autoencoder weights in a bundle; load_model upcasts
+# them to float32. 'float16' halves their size but changes the reloaded
+# model's scores (small batches run on the float32 NumPy path), so bundles
+# keep full precision. The Isolation Forest's split thresholds and leaf
+# depths are always stored exactly: rounding them would move samples across
+# splits.
+WEIGHT_STORAGE_DTYPE = 'float32'
+
+
+def _json_dumps(obj, indent: bool = False) -> bytes:
+    """Serialize to JSON bytes with orjson when available."""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if indent else None).encode()
+
+
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+# CSV sensor columns: S1_x, S1_y, S1_z, S2_x, ...
+_is_sensor_column = re.compile(r'S\d').match
+
+# pandas, imported on first use: only CSV training needs it
+_pd = None
+
+
+def _get_pd():
+    """The pandas module, imported once on first call."""
+    global _pd
+    if _pd is None:
+        import pandas
+        _pd = pandas
+    return _pd
+
+
+def _stage_bundle(arrays: Dict[str, np.ndarray], header: Dict) -> io.BytesIO:
+    """
+    Serialize named arrays and a header into one in-memory bundle.
+    
+    Layout: .npy records back to back (each starting on a 64-byte
+    boundary), then a JSON footer holding the header and every record's
+    offset, then the footer's length as 8 little-endian bytes.
+    """
+    buffer = io.BytesIO()
+    offsets = {}
+    for name, array in arrays.items():
+        buffer.write(b'\0' * (-buffer.tell() % BUNDLE_ALIGNMENT))
+        offsets[name] = buffer.tell()
+        np.lib.format.write_array(buffer, np.ascontiguousarray(array), allow_pickle=False)
+    footer = _json_dumps({'arrays': offsets, 'header': header})
+    buffer.write(footer)
+    buffer.write(len(footer).to_bytes(8, 'little'))
+    return buffer
+
+
+def _write_durable(path: Path, data) -> None:
+    """
+    Write bytes with one buffered write and one fsync to a temporary file,
+    then rename it into place, so readers see the whole file or none of it.
+    """
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb', buffering=BUNDLE_WRITE_BUFFER) as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _read_bundle(path: Path, mmap_mode: Optional[str] = None) -> Tuple[Dict[str, np.ndarray], Dict]:
+    """
+    Read the (arrays, header) staged by _stage_bundle.
+    
+    One open; the footer gives each record's offset, and every array is
+    read by seeking there and filling its final buffer straight from the
+    file (no zip directory, no intermediate copy of the whole bundle).
+    
+    Args:
+        path: Bundle file
+        mmap_mode: If given (e.g. 'r'), arrays are memory-mapped views of
+            the file instead of copies; pages are read on first touch and
+            shared between processes mapping the same bundle
+    """
+    with open(path, 'rb') as f:
+        f.seek(-8, os.SEEK_END)
+        footer_len = int.from_bytes(f.read(8), 'little')
+        f.seek(-8 - footer_len, os.SEEK_END)
+        footer = _json_loads(f.read(footer_len))
+        
+        arrays = {}
+        for name, offset in footer['arrays'].items():
+            f.seek(offset)
+            arrays[name] = _read_record(f, path, mmap_mode)
+    return arrays, footer['header']
+
+
+def _read_record(f, path: Path, mmap_mode: Optional[str]) -> np.ndarray:
+    """Read (or map) the .npy record at the file's current position."""
+    if mmap_mode is not None:
+        start = f.tell()
+        version = np.lib.format.read_magic(f)
+        if version in ((1, 0), (2, 0)):
+            read_header = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                           else np.lib.format.read_array_header_2_0)
+            shape, fortran_order, dtype = read_header(f)
+            if math.prod(shape) > 0 and not dtype.hasobject:
+                return np.memmap(path, dtype=dtype, mode=mmap_mode, offset=f.tell(),
+                                 shape=shape, order='F' if fortran_order else 'C')
+        f.seek(start)
+    return np.lib.format.read_array(f, allow_pickle=False)
+
+
+@dataclass(slots=True, frozen=True)
 class ModelInfo:
-    """Metadata for a trained model."""
+    """
+    Metadata for a trained model.
+    
+    Immutable: load_model hands out the instance cached for a version, so
+    it is shared between the manager and any concurrent readers.
+    """
     version: str
     name: str
     created_at: str
@@ -33,6 +181,8 @@ class ModelInfo:
     ae_trained: bool
     contamination: float
     description: str = ""
+    # Versions written before quantized storage hold float32 weights
+    storage_dtype: str = 'float32'
     
     def to_dict(self) -> Dict:
         return asdict(self)
@@ -53,36 +203,151 @@ class ModelManager:
         
         self.models_dir = Path(models_dir)
         self.models_dir.mkdir(parents=True, exist_ok=True)
+        # Plain-string prefix for per-version paths on hot lookups
+        self._models_dir_str = os.fspath(self.models_dir)
         
         self.current_model: Optional[HybridAnomalyDetector] = None
         self.current_version: Optional[str] = None
         self.feature_extractor: Optional[FeatureExtractor] = None
         self.model_info: Optional[ModelInfo] = None
         
-        # Load latest model if available
-        self._load_latest_model()
+        # Version listing, reused until the models directory changes (its
+        # mtime moves when a version is added/removed)
+        self._versions_cache: Optional[List[str]] = None
+        self._dir_mtime: Optional[int] = None
+        
+        # Parsed info.json files, keyed by (version, mtime_ns) so an edited
+        # file is simply a cache miss
+        self._load_info = lru_cache(maxsize=INFO_CACHE_SIZE)(self._read_info)
+        
+        # Trained versions are written to disk in the background; readers of
+        # a version wait on its pending save
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='model-save')
+        # Reused across list_models calls; threads start on first use
+        self._io_pool = ThreadPoolExecutor(max_workers=LIST_IO_WORKERS, thread_name_prefix='model-info')
+        self._pending_saves: Dict[str, Future] = {}
+        # Versions whose save failed since the last wait_for_saves()
+        self._failed_saves: Set[str] = set()
+        
+        # Load latest model if available, off the constructor's thread so
+        # startup doesn't block on disk; callers wait on _loaded_evt
+        self._loaded_evt = threading.Event()
+        threading.Thread(target=self._load_initial_model, name='model-load', daemon=True).start()
+    
+    def _load_initial_model(self) -> None:
+        """Startup load of the latest model; always releases waiters."""
+        try:
+            self._load_latest_model()
+        finally:
+            self._loaded_evt.set()
+    
+    def is_loading(self) -> bool:
+        """Whether the startup load is still running (for health checks)."""
+        return not self._loaded_evt.is_set()
     
     def _load_latest_model(self) -> bool:
         """Load the most recent model."""
         try:
-            versions = self._list_versions()
-            if not versions:
-                return False
-            
-            latest_version = versions[-1]
-            self.load_model(latest_version)
-            return True
+            # Newest complete version: info.json is written last, so a
+            # directory without it is a save that never finished
+            for version in reversed(self._list_versions()):
+                self._wait_for_save(version)
+                if os.path.exists(self._info_path(version)):
+                    return self._load_version(version)
+                print(f"Skipping incomplete model: {version}")
+            return False
         except Exception as e:
             print(f"Could not load latest model: {e}")
             return False
     
     def _list_versions(self) -> List[str]:
         """List all available model versions."""
-        versions = []
-        for version_dir in sorted(self.models_dir.glob("v*")):
-            if version_dir.is_dir():
-                versions.append(version_dir.name)
-        return versions
+        dir_mtime = os.stat(self.models_dir).st_mtime_ns
+        if self._versions_cache is None or dir_mtime != self._dir_mtime:
+            with os.scandir(self.models_dir) as entries:
+                self._versions_cache = sorted(
+                    entry.name for entry in entries
+                    if entry.name.startswith('v') and entry.is_dir()
+                )
+            self._dir_mtime = dir_mtime
+        return list(self._versions_cache)
+    
+    def _invalidate_cache(self) -> None:
+        """Forget the cached version listing."""
+        self._versions_cache = None
+    
+    def _wait_for_save(self, version: str) -> None:
+        """
+        Block until a background save of this version has finished.
+        
+        A failed save was already reported by _flush_to_disk; readers then
+        find the version's files missing, as for any incomplete version.
+        """
+        future = self._pending_saves.get(version)
+        if future is not None:
+            future.exception()
+    
+    def wait_for_saves(self) -> bool:
+        """
+        Block until every background save started by train_model is done.
+        
+        Returns:
+            True if all of them were written successfully (a failure is
+            reported once, by the first call after it)
+        """
+        # A future can finish before its done callback has recorded it, so
+        # check both the outstanding futures and the recorded failures
+        ok = all([future.exception() is None
+                  for future in list(self._pending_saves.values())])
+        failed, self._failed_saves = self._failed_saves, set()
+        return ok and not failed
+    
+    def _save_done(self, version: str, future: Future) -> None:
+        """Done callback of a background save: retire it, remembering failures."""
+        if future.exception() is not None:
+            self._failed_saves.add(version)
+        self._pending_saves.pop(version, None)
+    
+    def _flush_to_disk(self, version: str, bundle: io.BytesIO, info_json: bytes) -> None:
+        """Persist a staged version: the detector bundle, then info.json."""
+        version_dir = self.models_dir / version
+        try:
+            _write_durable(version_dir / BUNDLE_NAME, bundle.getbuffer())
+            _write_durable(version_dir / "info.json", info_json)
+        except Exception as e:
+            print(f"✗ Error saving model {version}: {e}")
+            raise
+        print(f"✓ Model saved: {version}")
+        print(f"  Location: {version_dir}")
+    
+    def _info_path(self, version: str) -> str:
+        """Path of a version's info.json, joined as a string (no Path objects)."""
+        return os.path.join(self._models_dir_str, version, "info.json")
+    
+    def _read_info(self, version: str, mtime_ns: int) -> Tuple[ModelInfo, Dict]:
+        """Parse a version's info.json; mtime_ns only keys the cache."""
+        with open(self._info_path(version), 'rb') as f:
+            info = ModelInfo(**_json_loads(f.read()))
+        return info, info.to_dict()
+    
+    def _get_info(self, version: str) -> Optional[Tuple[ModelInfo, Dict]]:
+        """
+        Cached (ModelInfo, dict) for a version, or None without a readable
+        info.json.
+        
+        A warm lookup costs one stat, which doubles as the existence check.
+        """
+        try:
+            mtime_ns = os.stat(self._info_path(version)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        try:
+            return self._load_info(version, mtime_ns)
+        except (TypeError, ValueError) as e:
+            # Malformed JSON or fields ModelInfo doesn't know; one bad
+            # version must not break listing the others
+            print(f"✗ Invalid info.json for model {version}: {e}")
+            return None
     
     def train_model(self, features: np.ndarray, baseline_name: str = "baseline",
                    contamination: float = 0.1) -> str:
@@ -95,8 +360,13 @@ class ModelManager:
             contamination: Anomaly contamination rate
             
         Returns:
-            Version string for new model
+            Version string for new model (its files are still being written;
+            this manager's readers wait for them, other processes should
+            call wait_for_saves() first)
         """
+        # The startup load must not replace the model trained here
+        self._loaded_evt.wait()
+        
         print(f"\n{'='*80}")
         print(f"🔧 Training new anomaly detection model")
         print(f"{'='*80}")
@@ -114,9 +384,6 @@ class ModelManager:
         detector = HybridAnomalyDetector(num_features, contamination)
         detector.train(features, name=baseline_name)
         
-        # Save models
-        detector.save(version_dir)
-        
         # Create model info
         info = ModelInfo(
             version=version,
@@ -127,24 +394,34 @@ class ModelManager:
             num_features=num_features,
             if_trained=True,
             ae_trained=True,
-            contamination=contamination
+            contamination=contamination,
+            storage_dtype=WEIGHT_STORAGE_DTYPE
         )
         
-        # Save metadata
-        info_file = version_dir / "info.json"
-        with open(info_file, 'w') as f:
-            json.dump(info.to_dict(), f, indent=2)
+        # Stage the detector and metadata in memory, then write them to disk
+        # in the background (one bundle + info.json, each a single fsync)
+        arrays, header = detector.to_arrays()
+        for name in arrays:
+            if name.startswith('ae_weight_'):
+                arrays[name] = arrays[name].astype(WEIGHT_STORAGE_DTYPE, copy=False)
+        bundle = _stage_bundle(arrays, header)
+        info_json = _json_dumps(info.to_dict(), indent=True)
+        future = self._executor.submit(self._flush_to_disk, version, bundle, info_json)
+        self._pending_saves[version] = future
+        future.add_done_callback(lambda future, version=version: self._save_done(version, future))
+        self._invalidate_cache()
         
         # Set as current
         self.current_model = detector
         self.current_version = version
         self.model_info = info
         
+        # "Model saved" follows from the background save (wait_for_saves)
         print(f"\n✓ Model trained successfully!")
         print(f"  Version: {version}")
         print(f"  Samples: {features.shape[0]}")
         print(f"  Features: {num_features}")
-        print(f"  Location: {version_dir}")
+        print(f"  Saving to: {version_dir}")
         print(f"{'='*80}\n")
         
         return version
@@ -159,22 +436,39 @@ class ModelManager:
         Returns:
             True if successful
         """
+        self._loaded_evt.wait()
+        return self._load_version(version)
+    
+    def _load_version(self, version: str) -> bool:
+        """load_model without waiting for the startup load (which uses it)."""
         try:
+            self._wait_for_save(version)
             version_dir = self.models_dir / version
             if not version_dir.exists():
                 print(f"✗ Model version not found: {version}")
                 return False
+            if not os.path.exists(self._info_path(version)):
+                # info.json is written last: the save was interrupted
+                print(f"✗ Model version is incomplete: {version}")
+                return False
             
-            # Load detector
-            detector = HybridAnomalyDetector(input_dim=None)
-            detector.load(version_dir)
+            # Load detector; versions saved before bundles have one file per part
+            bundle_path = version_dir / BUNDLE_NAME
+            if bundle_path.exists():
+                # Mapped, not read: the arrays page in from the bundle on use
+                arrays, header = _read_bundle(bundle_path, mmap_mode='r')
+                for name in arrays:
+                    if name.startswith('ae_weight_'):
+                        arrays[name] = arrays[name].astype(np.float32, copy=False)
+                detector = HybridAnomalyDetector.from_arrays(arrays, header)
+            else:
+                detector = HybridAnomalyDetector(input_dim=None)
+                detector.load(version_dir)
             
             # Load metadata
-            info_file = version_dir / "info.json"
-            if info_file.exists():
-                with open(info_file, 'r') as f:
-                    info_dict = json.load(f)
-                    self.model_info = ModelInfo(**info_dict)
+            cached_info = self._get_info(version)
+            if cached_info is not None:
+                self.model_info = cached_info[0]
             
             self.current_model = detector
             self.current_version = version
@@ -195,6 +489,7 @@ class ModelManager:
         Returns:
             Prediction result dictionary
         """
+        self._loaded_evt.wait(INITIAL_LOAD_TIMEOUT)
         if not self.current_model:
             return {'error': 'No model loaded'}
         
@@ -203,54 +498,82 @@ class ModelManager:
     def get_model_info(self, version: Optional[str] = None) -> Optional[Dict]:
         """Get information about a model version."""
         if version is None:
-            version = self.current_version
+            version = self.get_current_version()
         
         if version is None:
             return None
         
-        version_dir = self.models_dir / version
-        info_file = version_dir / "info.json"
-        
-        if info_file.exists():
-            with open(info_file, 'r') as f:
-                return json.load(f)
+        self._wait_for_save(version)
+        cached_info = self._get_info(version)
+        if cached_info is None:
+            return None
         
-        return None
+        # Callers annotate the result (e.g. 'is_current'), so hand out a copy
+        return dict(cached_info[1])
     
     def list_models(self) -> List[Dict]:
         """List all trained models with metadata."""
+        versions = self._list_versions()
+        current_version = self.get_current_version()
+        # Each version's stat/read overlaps the others' instead of queuing
+        if len(versions) > 1:
+            infos = self._io_pool.map(self.get_model_info, versions)
+        else:
+            infos = map(self.get_model_info, versions)
+        
         models = []
-        for version in self._list_versions():
-            info = self.get_model_info(version)
+        for version, info in zip(versions, infos):
             if info:
-                info['is_current'] = (version == self.current_version)
+                info['is_current'] = (version == current_version)
                 models.append(info)
         return models
     
     def delete_model(self, version: str) -> bool:
         """Delete a model version."""
+        self._loaded_evt.wait()
+        was_current = False
         try:
+            self._wait_for_save(version)
             version_dir = self.models_dir / version
             if version_dir.exists():
+                was_current = version == self.current_version
+                if was_current:
+                    # The loaded detector maps the version's bundle, and
+                    # Windows refuses to delete mapped files: drop it (and
+                    # its reference cycles) so the maps close first
+                    self.current_model = None
+                    self.current_version = None
+                    self.model_info = None
+                    gc.collect()
+                
                 shutil.rmtree(version_dir)
+                self._invalidate_cache()
                 print(f"✓ Deleted model: {version}")
                 
                 # If we deleted current model, load latest
-                if version == self.current_version:
+                if was_current:
                     self._load_latest_model()
                 
                 return True
         except Exception as e:
             print(f"✗ Error deleting model: {e}")
+            # The version (or what rmtree left of it) is still on disk: don't
+            # leave the server without a model
+            if was_current and self.current_model is None:
+                self._invalidate_cache()
+                if not self._load_version(version):
+                    self._load_latest_model()
         
         return False
     
     def is_model_loaded(self) -> bool:
         """Check if a model is currently loaded."""
+        self._loaded_evt.wait(INITIAL_LOAD_TIMEOUT)
         return self.current_model is not None
     
     def get_current_version(self) -> Optional[str]:
         """Get current model version."""
+        self._loaded_evt.wait(INITIAL_LOAD_TIMEOUT)
         return self.current_version
 
 
@@ -276,16 +599,19 @@ class ModelTrainer:
             Model version or None
         """
         try:
-            import pandas as pd
+            pd = _get_pd()
             
             print(f"Loading data from {csv_file}...")
-            df = pd.read_csv(csv_file)
             
-            # Extract sensor columns (format: S1_x, S1_y, S1_z, S2_x, ...)
-            sensor_cols = [col for col in df.columns 
-                          if col.startswith('S') and col[1].isdigit()]
+            # Find the sensor columns (format: S1_x, S1_y, S1_z, S2_x, ...)
+            # from the header, then parse only those, straight to float32
+            columns = pd.read_csv(csv_file, nrows=0).columns
+            sensor_cols = [col for col in columns if isinstance(col, str) and _is_sensor_column(col)]
+            df = pd.read_csv(csv_file, usecols=sensor_cols, dtype=np.float32,
+                             engine='pyarrow' if PYARROW_AVAILABLE else 'c')
             
-            data = df[sensor_cols].values
+            # One float32 block, so this is a view rather than a copy
+            data = df.to_numpy(copy=False)
             print(f"Loaded {data.shape[0]} samples, {data.shape[1]} features")
             
             # Initialize batch extractor
@@ -328,8 +654,11 @@ class ModelTrainer:
             Model version or None
         """
         try:
-            # Combine arrays
-            combined = np.hstack(data_arrays)
+            # Combine arrays straight into one float32 buffer, the dtype
+            # feature extraction works in, without an intermediate copy
+            total_cols = sum(a.shape[1] for a in data_arrays)
+            combined = np.empty((data_arrays[0].shape[0], total_cols), dtype=np.float32)
+            np.concatenate(data_arrays, axis=1, out=combined, casting='same_kind')
             print(f"Combined data shape: {combined.shape}")
             
             # Initialize batch extractor
@@ -7,11 +7,67 @@ advanced, and correlation metrics.
 import numpy as np
 from scipy import signal, stats
 from scipy.fft import fft, fftfreq
+from scipy.spatial.distance import cdist
 from typing import Dict, Tuple, List
 import warnings
 
+# Numba compiles the entropy template-matching loops
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 warnings.filterwarnings('ignore')
 
+# Trajectory points per block of the Lyapunov distance matrix (bounds its
+# memory to this many rows of the full pairwise matrix)
+LYAPUNOV_BLOCK_ROWS = 1024
+
+
+def _template_matches_numpy(sig: np.ndarray, m: int, r: float, num_templates: int) -> Tuple[int, int]:
+    """
+    Count template pairs i < j whose Chebyshev distance is below r.
+    
+    Returns (matches of length m among the first num_templates templates,
+    matches of length m + 1 among the first num_templates - 1). A length
+    m + 1 match is a length m match plus one more comparison, so both
+    counts come out of one pass.
+    """
+    matches = 0
+    matches_next = 0
+    for i in range(num_templates - 1):
+        within = np.abs(sig[i + 1:num_templates] - sig[i]) < r
+        for k in range(1, m):
+            within &= np.abs(sig[i + 1 + k:num_templates + k] - sig[i + k]) < r
+        matches += int(np.count_nonzero(within))
+        
+        # Pairs whose second template has an (m + 1)-th sample
+        within_next = within[:num_templates - i - 2]
+        within_next &= np.abs(sig[i + 1 + m:num_templates - 1 + m] - sig[i + m]) < r
+        matches_next += int(np.count_nonzero(within_next))
+    return matches, matches_next
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _template_matches(sig, m, r, num_templates):
+        """Same as _template_matches_numpy, stopping each pair at its first mismatch."""
+        matches = 0
+        matches_next = 0
+        for i in range(num_templates - 1):
+            for j in range(i + 1, num_templates):
+                k = 0
+                while k < m and abs(sig[i + k] - sig[j + k]) < r:
+                    k += 1
+                if k == m:
+                    matches += 1
+                    if j < num_templates - 1 and abs(sig[i + m] - sig[j + m]) < r:
+                        matches_next += 1
+        return matches, matches_next
+else:
+    _template_matches = _template_matches_numpy
+
 
 class ParameterCalculator:
     """Calculates comprehensive vibration monitoring parameters."""
@@ -366,23 +422,15 @@ class ParameterCalculator:
         taus = []
         
         for lag in lags:
-            # Split into chunks and calculate R/S
-            chunks = n // lag
-            rs_values = []
-            
-            for i in range(chunks):
-                chunk = sig[i*lag:(i+1)*lag]
-                if len(chunk) > 0:
-                    mean_chunk = np.mean(chunk)
-                    Y = np.cumsum(chunk - mean_chunk)
-                    R = np.max(Y) - np.min(Y)
-                    S = np.std(chunk, ddof=1)
-                    
-                    if S > 0:
-                        rs_values.append(R / S)
+            # Split into chunks (one row each) and calculate R/S for all
+            chunks = sig[:(n // lag) * lag].reshape(-1, lag)
+            Y = np.cumsum(chunks - chunks.mean(axis=1, keepdims=True), axis=1)
+            R = Y.max(axis=1) - Y.min(axis=1)
+            S = chunks.std(axis=1, ddof=1)
             
-            if rs_values:
-                taus.append(np.mean(rs_values))
+            valid = S > 0
+            if valid.any():
+                taus.append(np.mean(R[valid] / S[valid]))
         
         if len(taus) > 1:
             # Linear regression in log-log
@@ -401,34 +449,33 @@ class ParameterCalculator:
         if n < dim * delay + 100:
             return 0.0
         
-        # Reconstruct phase space
+        # Reconstruct phase space: row t is (sig[t], sig[t + delay], ...)
         m = n - (dim - 1) * delay
-        trajectory = np.zeros((m, dim))
-        
-        for i in range(dim):
-            trajectory[:, i] = sig[i*delay:i*delay + m]
-        
-        # Find nearest neighbors and calculate divergence
-        lyap_sum = 0
-        count = 0
-        
-        for i in range(m - delay):
-            # Find nearest neighbor
-            distances = np.linalg.norm(trajectory[i:i+1, :] - trajectory, axis=1)
-            distances[i] = np.inf
-            nearest_idx = np.argmin(distances)
-            
-            # Calculate divergence rate
-            if i + delay < m and nearest_idx + delay < m:
-                initial_dist = distances[nearest_idx]
-                final_dist = np.linalg.norm(trajectory[i + delay] - trajectory[nearest_idx + delay])
-                
-                if initial_dist > 0 and final_dist > 0:
-                    lyap_sum += np.log(final_dist / initial_dist)
-                    count += 1
-        
+        trajectory = np.lib.stride_tricks.sliding_window_view(sig, (dim - 1) * delay + 1)[:, ::delay]
+        
+        # Nearest neighbor (other than itself) of every point that has a
+        # successor, from the pairwise distance matrix a block of rows at a time
+        rows = m - delay
+        nearest = np.empty(rows, dtype=np.intp)
+        initial_dist = np.empty(rows)
+        for start in range(0, rows, LYAPUNOV_BLOCK_ROWS):
+            stop = min(start + LYAPUNOV_BLOCK_ROWS, rows)
+            block = np.arange(stop - start)
+            distances = cdist(trajectory[start:stop], trajectory)
+            distances[block, block + start] = np.inf
+            nearest[start:stop] = np.argmin(distances, axis=1)
+            initial_dist[start:stop] = distances[block, nearest[start:stop]]
+        
+        # Divergence rate over delay steps, for pairs whose neighbor also has
+        # a successor
+        idx = np.flatnonzero(nearest + delay < m)
+        initial_dist = initial_dist[idx]
+        final_dist = np.linalg.norm(trajectory[idx + delay] - trajectory[nearest[idx] + delay], axis=1)
+        
+        valid = (initial_dist > 0) & (final_dist > 0)
+        count = np.count_nonzero(valid)
         if count > 0:
-            return lyap_sum / (count * delay)
+            return np.sum(np.log(final_dist[valid] / initial_dist[valid])) / (count * delay)
         
         return 0.0
     
@@ -479,24 +526,8 @@ class ParameterCalculator:
         if n < m + 1:
             return 0.0
         
-        def _maxdist(x_i, x_j):
-            return max(abs(ua - va) for ua, va in zip(x_i, x_j))
-        
-        # Count matches for m and m+1
-        phi_m = 0
-        phi_m1 = 0
-        
-        for i in range(n - m):
-            template = sig[i:i + m]
-            for j in range(i + 1, n - m):
-                if _maxdist(template, sig[j:j + m]) < r:
-                    phi_m += 1
-        
-        for i in range(n - m - 1):
-            template = sig[i:i + m + 1]
-            for j in range(i + 1, n - m - 1):
-                if _maxdist(template, sig[j:j + m + 1]) < r:
-                    phi_m1 += 1
+        # Count matches for m and m+1 (over the first n - m templates)
+        phi_m, phi_m1 = _template_matches(np.ascontiguousarray(sig, dtype=np.float64), m, r, n - m)
         
         if phi_m > 0 and phi_m1 > 0:
             return -np.log(phi_m1 / phi_m)
@@ -511,18 +542,10 @@ class ParameterCalculator:
         if n < m + 1:
             return 0.0
         
-        def _count_patterns(data, pattern_len, tolerance):
-            count = 0
-            for i in range(len(data) - pattern_len + 1):
-                pattern = data[i:i + pattern_len]
-                for j in range(i + 1, len(data) - pattern_len + 1):
-                    if max(abs(p - d) for p, d in zip(pattern, data[j:j + pattern_len])) < tolerance:
-                        count += 1
-            return count
-        
-        # Calculate entropy for m and m+1
-        c_m = _count_patterns(sig, m, r) / (n - m + 1)
-        c_m1 = _count_patterns(sig, m + 1, r) / (n - m)
+        # Calculate entropy for m and m+1 (over every template of each length)
+        count_m, count_m1 = _template_matches(np.ascontiguousarray(sig, dtype=np.float64), m, r, n - m + 1)
+        c_m = count_m / (n - m + 1)
+        c_m1 = count_m1 / (n - m)
         
         if c_m > 0 and c_m1 > 0:
             return np.log(c_m / c_m1)
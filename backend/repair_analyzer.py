@@ -436,7 +436,14 @@ def load_csv_data(filename: str) -> np.ndarray:
 
     Handles CSV with/without headers. Expects 4 columns (sensors) by default but
     will accept any number >= 1. Returns a numpy array of shape [samples, sensors].
+    Binary .npy arrays (e.g. from generate_sample_data.py --format npy) are
+    loaded directly without text parsing.
     """
+    if str(filename).endswith('.npy'):
+        data = np.load(filename).astype(float)
+        if data.ndim != 2 or data.shape[0] < 100 or data.shape[1] < 1:
+            raise ValueError(f"Unexpected data shape: {data.shape}")
+        return data
     try:
         try:
             df = pd.read_csv(filename)
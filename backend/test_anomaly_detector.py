@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Test script for the Isolation Forest fast paths.
+
+Checks on seeded forests that:
+1. The packed-forest kernel reproduces sklearn's score_samples
+2. predict_fast's early-exit flags agree with the full scores
+3. A detector rebuilt from to_arrays() scores and predicts like sklearn
+4. Hybrid single-sample predictions are cached and invalidated correctly
+5. Kernels compiled under one import name still work under the other
+   (anomaly_detector and feature_extractor)
+"""
+
+import sys
+import os
+import contextlib
+import io
+import subprocess
+import tempfile
+import numpy as np
+from pathlib import Path
+from sklearn.ensemble import IsolationForest
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ml_models.anomaly_detector import (
+    NUMBA_AVAILABLE,
+    HybridAnomalyDetector,
+    IsolationForestAnomalyDetector,
+    _pack_forest,
+)
+
+if NUMBA_AVAILABLE:
+    from ml_models.anomaly_detector import _forest_score_samples
+
+
+def _seeded_data(num_samples=400, num_features=10, seed=0):
+    """Gaussian baseline plus a uniform test batch with clear outliers"""
+    rng = np.random.default_rng(seed)
+    train = rng.normal(size=(num_samples, num_features)).astype(np.float32)
+    test = np.vstack([
+        rng.normal(size=(150, num_features)),
+        rng.uniform(-6, 6, size=(50, num_features)),
+    ]).astype(np.float32)
+    return train, test
+
+
+def test_packed_forest_scores():
+    """_forest_score_samples == IsolationForest.score_samples"""
+    print("\n" + "="*80)
+    print("PACKED FOREST vs SKLEARN score_samples")
+    print("="*80)
+    
+    if not NUMBA_AVAILABLE:
+        print("\n⚠️  numba not installed: the packed forest is unused. Skipping.")
+        return
+    
+    train, test = _seeded_data()
+    cases = [
+        ("All features", {}),
+        # Trees see column subsets: packed feature ids must map back
+        ("max_features=0.5", {'max_features': 0.5}),
+        ("Small subsample", {'max_samples': 32}),
+    ]
+    for name, params in cases:
+        model = IsolationForest(n_estimators=32, random_state=42, **params).fit(train)
+        forest = _pack_forest(model)
+        assert forest is not None
+        
+        expected = model.score_samples(test)
+        actual = _forest_score_samples(np.ascontiguousarray(test), *forest)
+        np.testing.assert_allclose(actual, expected, rtol=1e-12, atol=0)
+        print(f"✓ {name}: {len(test)} scores match (max diff {np.abs(actual - expected).max():.1e})")
+    
+    detector = IsolationForestAnomalyDetector(contamination=0.1)
+    detector.train(train)
+    scaled = detector._transform(test)
+    np.testing.assert_allclose(detector._raw_scores(scaled),
+                               detector.model.score_samples(scaled), rtol=1e-12, atol=0)
+    print("✓ Trained detector: _raw_scores uses the packed forest faithfully")
+
+
+def test_predict_fast():
+    """Early-exit flags agree with thresholding the full raw scores"""
+    print("\n" + "="*80)
+    print("predict_fast vs FULL SCORES")
+    print("="*80)
+    
+    train, test = _seeded_data(seed=1)
+    detector = IsolationForestAnomalyDetector(contamination=0.1)
+    detector.train(train)
+    scaled = detector._transform(test)
+    scores = detector.model.score_samples(scaled)
+    
+    # Default: the fitted model's own decision, as IsolationForest.predict
+    flags = detector.predict_fast(test)
+    expected = detector.model.predict(scaled) == -1
+    assert flags.dtype == bool and flags.shape == (len(test),)
+    assert 0 < expected.sum() < len(test)
+    clear = np.abs(scores - detector.model.offset_) > 0.01
+    assert np.array_equal(flags[clear], expected[clear])
+    print(f"✓ Default threshold (offset_={detector.model.offset_:.4f}): "
+          f"{int(flags.sum())} flagged, {int(expected.sum())} by sklearn")
+    
+    for quantile in (0.05, 0.2, 0.5):
+        threshold = float(np.quantile(scores, quantile))
+        expected = scores < threshold
+        flags = detector.predict_fast(test, threshold=threshold)
+        
+        # Early exit may only flip samples right at the threshold
+        clear = np.abs(scores - threshold) > 0.01
+        assert np.array_equal(flags[clear], expected[clear]), quantile
+        agreement = np.mean(flags == expected)
+        assert agreement >= 0.95, (quantile, agreement)
+        print(f"✓ threshold={threshold:.4f}: {agreement*100:.1f}% agreement, "
+              f"{int(expected.sum())} flagged")
+    
+    # Thresholds outside the raw score range [-1, 0) need no traversal
+    assert not detector.predict_fast(test, threshold=-1.0).any()
+    assert detector.predict_fast(test, threshold=0.0).all()
+    assert detector.predict_fast(test[0]).shape == (1,)
+    print("✓ Out-of-range thresholds and single samples")
+
+
+def test_bundle_round_trip_vs_sklearn():
+    """from_arrays(to_arrays()) scores and predicts exactly as the original sklearn forest"""
+    print("\n" + "="*80)
+    print("to_arrays / from_arrays vs SKLEARN")
+    print("="*80)
+    
+    train, test = _seeded_data(seed=2)
+    with contextlib.redirect_stdout(io.StringIO()):
+        detector = HybridAnomalyDetector(train.shape[1], contamination=0.1)
+        detector.train(train, name="round-trip")
+        restored = HybridAnomalyDetector.from_arrays(*detector.to_arrays())
+    
+    original = detector.if_detector
+    model = original.model
+    scaled = original._transform(test)
+    restored_scaled = restored.if_detector._transform(test)
+    np.testing.assert_array_equal(restored_scaled, scaled)
+    
+    raw = restored.if_detector._raw_scores(restored_scaled)
+    np.testing.assert_allclose(raw, model.score_samples(scaled), rtol=1e-12, atol=0)
+    # sklearn's binary decision follows from the same scores
+    np.testing.assert_array_equal(np.where(raw < model.offset_, -1, 1), model.predict(scaled))
+    np.testing.assert_array_equal(restored.if_detector.model.predict(scaled), model.predict(scaled))
+    print(f"✓ Restored forest matches sklearn on {len(test)} samples")
+    
+    for sample in test[:10]:
+        assert restored.predict(sample) == detector.predict(sample)
+    assert restored.predict(test) == detector.predict(test)
+    assert restored.metadata == detector.metadata
+    print("✓ Hybrid predictions identical after the round trip")
+
+
+def test_single_sample_cache():
+    """Hybrid single-sample predictions are cached and invalidated on retraining"""
+    print("\n" + "="*80)
+    print("SINGLE-SAMPLE SCORE CACHE")
+    print("="*80)
+    
+    train, test = _seeded_data(seed=3)
+    with contextlib.redirect_stdout(io.StringIO()):
+        detector = HybridAnomalyDetector(train.shape[1], contamination=0.1)
+        detector.train(train)
+    
+    sample = test[-1]
+    first = detector.predict(sample)
+    assert first == detector.predict(test[-1:])
+    first['annotated'] = True  # callers get their own copy
+    assert detector.predict(sample.copy()) == detector.predict(test[-1:])
+    assert detector._score_cache.cache_info().hits == 1
+    print(f"✓ Cached: {detector._score_cache.cache_info()}")
+    
+    # New scaler statistics and forest: the cached result must not survive
+    with contextlib.redirect_stdout(io.StringIO()):
+        detector.train(train * 3.0 + 1.0)
+    assert detector._score_cache.cache_info().currsize == 0
+    assert detector.predict(sample) == detector.predict(test[-1:])
+    
+    restored = HybridAnomalyDetector.from_arrays(*detector.to_arrays())
+    assert restored.predict(sample) == detector.predict(sample)
+    print("✓ Cleared on retraining; restored detectors start with their own cache")
+
+
+# Runs the numba kernels of each ml_models module imported as `{prefix}<module>`
+_IMPORT_NAME_SCRIPT = """
+import sys
+import numpy as np
+sys.path[:0] = {paths!r}
+from {prefix}anomaly_detector import IsolationForestAnomalyDetector
+from {prefix}feature_extractor import FeatureExtractor
+detector = IsolationForestAnomalyDetector()
+detector.train(np.random.default_rng(0).normal(size=(300, 6)).astype(np.float32))
+print(detector.predict(np.zeros(6, dtype=np.float32)))
+print(detector.predict_fast(np.ones((4, 6), dtype=np.float32)))
+extractor = FeatureExtractor(fs=100.0, num_sensors=2)
+print(extractor.extract_features_array(np.random.default_rng(1).normal(size=(2, 512))))
+"""
+
+
+def test_import_names_share_numba_cache():
+    """The training tool's and the app's import names don't break each other"""
+    print("\n" + "="*80)
+    print("IMPORT NAMES vs NUMBA CACHE")
+    print("="*80)
+    
+    backend_dir = Path(__file__).parent
+    tools_dir = backend_dir.parent / "tools"
+    # The training tool imports the package modules, as the app does
+    tool_check = (f"import sys; sys.path.insert(0, {str(tools_dir)!r}); import train_ml_models; "
+                  f"assert train_ml_models.HybridAnomalyDetector.__module__ == 'ml_models.anomaly_detector'")
+    runs = [
+        ("tools/train_ml_models.py", ["-c", tool_check]),
+        # Bare module names first, as older scripts imported them, then the package
+        ("anomaly_detector / feature_extractor", ["-c", _IMPORT_NAME_SCRIPT.format(
+            paths=[str(backend_dir / "ml_models")], prefix="")]),
+        ("ml_models.*", ["-c", _IMPORT_NAME_SCRIPT.format(
+            paths=[str(backend_dir)], prefix="ml_models.")]),
+    ]
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = dict(os.environ, NUMBA_CACHE_DIR=cache_dir)
+        for name, args in runs:
+            result = subprocess.run([sys.executable, *args], env=env, cwd=backend_dir,
+                                    capture_output=True, text=True)
+            assert result.returncode == 0, (name, result.stderr[-2000:])
+            print(f"✓ {name}")
+
+
+def main():
+    """Run all tests"""
+    test_packed_forest_scores()
+    test_predict_fast()
+    test_bundle_round_trip_vs_sklearn()
+    test_single_sample_cache()
+    test_import_names_share_numba_cache()
+    
+    print("\n" + "="*80)
+    print("TEST COMPLETE")
+    print("="*80)
+
+
+if __name__ == "__main__":
+    main()
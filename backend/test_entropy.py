@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script for the sample/approximate entropy template matching.
+
+Compares the numba kernel and its NumPy fallback against the original
+pair-by-pair loops, including signals with exact ties (distance == r,
+which must not count as a match).
+"""
+
+import sys
+import numpy as np
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from parameter_calculator import (
+    NUMBA_AVAILABLE,
+    ParameterCalculator,
+    _template_matches,
+    _template_matches_numpy,
+)
+
+
+def _baseline_count(sig, pattern_len, num_templates, r):
+    """Original loops: pairs i < j of the first num_templates templates closer than r"""
+    count = 0
+    for i in range(num_templates):
+        pattern = sig[i:i + pattern_len]
+        for j in range(i + 1, num_templates):
+            if max(abs(p - d) for p, d in zip(pattern, sig[j:j + pattern_len])) < r:
+                count += 1
+    return count
+
+
+def _baseline_sample_entropy(signal_data, m=2, r=0.2):
+    """Sample entropy as computed before the template matching kernels"""
+    sig = signal_data - np.mean(signal_data)
+    n = len(sig)
+    if n < m + 1:
+        return 0.0
+    phi_m = _baseline_count(sig, m, n - m, r)
+    phi_m1 = _baseline_count(sig, m + 1, n - m - 1, r)
+    if phi_m > 0 and phi_m1 > 0:
+        return -np.log(phi_m1 / phi_m)
+    return 0.0
+
+
+def _baseline_approximate_entropy(signal_data, m=2, r=0.2):
+    """Approximate entropy as computed before the template matching kernels"""
+    sig = signal_data - np.mean(signal_data)
+    n = len(sig)
+    if n < m + 1:
+        return 0.0
+    c_m = _baseline_count(sig, m, n - m + 1, r) / (n - m + 1)
+    c_m1 = _baseline_count(sig, m + 1, n - m, r) / (n - m)
+    if c_m > 0 and c_m1 > 0:
+        return np.log(c_m / c_m1)
+    return 0.0
+
+
+def _test_signals():
+    """(name, signal, r) cases: continuous, tied, constant and short"""
+    rng = np.random.default_rng(0)
+    return [
+        ("Gaussian noise", rng.normal(size=200), 0.2),
+        ("Sine + noise", np.sin(np.arange(300) * 0.1) + 0.1 * rng.normal(size=300), 0.2),
+        # Integer steps with r = 1: every neighbouring level is an exact tie
+        ("Integer levels (ties)", rng.integers(0, 4, size=150).astype(np.float64), 1.0),
+        ("Half steps (ties)", rng.integers(-3, 3, size=120) * 0.5, 0.5),
+        ("Constant", np.ones(50), 0.2),
+        ("Short", np.array([0.0, 0.1, 0.0, 0.1]), 0.2),
+    ]
+
+
+def test_template_matches():
+    """Both implementations give the original counts for m and m + 1"""
+    print("\n" + "="*80)
+    print(f"TEMPLATE MATCHES (numba: {NUMBA_AVAILABLE})")
+    print("="*80)
+    
+    implementations = [("numpy", _template_matches_numpy), ("default", _template_matches)]
+    for name, sig, r in _test_signals():
+        sig = np.ascontiguousarray(sig, dtype=np.float64)
+        n = len(sig)
+        for m in (1, 2, 3):
+            if n < m + 2:
+                continue
+            # Sample entropy uses n - m templates, approximate entropy n - m + 1
+            for num_templates in (n - m, n - m + 1):
+                expected = (_baseline_count(sig, m, num_templates, r),
+                            _baseline_count(sig, m + 1, num_templates - 1, r))
+                for impl_name, impl in implementations:
+                    actual = tuple(int(c) for c in impl(sig, m, r, num_templates))
+                    assert actual == expected, (name, m, num_templates, impl_name, actual, expected)
+        print(f"✓ {name}: counts match")
+
+
+def test_entropy_values():
+    """ParameterCalculator entropies equal the original loops exactly"""
+    print("\n" + "="*80)
+    print("SAMPLE / APPROXIMATE ENTROPY")
+    print("="*80)
+    
+    calc = ParameterCalculator()
+    for name, sig, r in _test_signals():
+        sample = calc._calculate_sample_entropy(sig, r=r)
+        approximate = calc._calculate_approximate_entropy(sig, r=r)
+        assert sample == _baseline_sample_entropy(sig, r=r), name
+        assert approximate == _baseline_approximate_entropy(sig, r=r), name
+        print(f"✓ {name}: SampEn={sample:.4f}, ApEn={approximate:.4f}")
+
+
+def main():
+    """Run all tests"""
+    test_template_matches()
+    test_entropy_values()
+    
+    print("\n" + "="*80)
+    print("TEST COMPLETE")
+    print("="*80)
+
+
+if __name__ == "__main__":
+    main()
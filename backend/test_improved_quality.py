@@ -122,6 +122,15 @@ def test_synthetic_cases():
             print(f"\n➡️  Similar: {improvement:.3f} (both formulas agree)")
 
 
+def test_empty_input():
+    """No modes: detect_repair_type keeps the baseline ('retrofitting', nan)"""
+    empty = np.array([])
+    repair_type, strength_factor = detect_repair_type(empty, empty, empty)
+    print(f"\nEmpty input -> {repair_type}, {strength_factor}")
+    assert repair_type == 'retrofitting'
+    assert np.isnan(strength_factor)
+
+
 def test_real_datasets():
     """Test with actual repair datasets"""
     print("\n\n" + "="*80)
@@ -215,6 +224,7 @@ def main():
     
     # Test 1: Synthetic cases
     test_synthetic_cases()
+    test_empty_input()
     
     # Test 2: Real datasets
     test_real_datasets()
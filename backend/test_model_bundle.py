@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Test script for the single-file model bundle.
+
+Checks that:
+1. Staged arrays survive a write/read round trip, copied or memory-mapped
+2. A trained model saves, reloads in a fresh manager and scores the same
+3. A failed background save is reported by wait_for_saves()
+4. A failed delete leaves the current model loaded
+"""
+
+import sys
+import tempfile
+import contextlib
+import io
+import json
+import numpy as np
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ml_models import model_manager
+from ml_models.model_manager import (
+    BUNDLE_ALIGNMENT,
+    ModelManager,
+    _read_bundle,
+    _stage_bundle,
+    _write_durable,
+)
+
+
+def test_bundle_round_trip():
+    """Stage -> write -> read, with and without mmap"""
+    print("\n" + "="*80)
+    print("BUNDLE ROUND TRIP")
+    print("="*80)
+    
+    rng = np.random.default_rng(0)
+    arrays = {
+        'scaler_mean': rng.normal(size=12).astype(np.float32),
+        'forest_left': np.arange(37, dtype=np.int32),
+        'empty': np.zeros((0, 4), dtype=np.float32),
+        'ae_weight_0': rng.normal(size=(12, 8)).astype(np.float16),
+        'fortran': np.asfortranarray(rng.normal(size=(5, 3))),
+        'blob': np.frombuffer(b'pickled model', dtype=np.uint8),
+    }
+    header = {'input_dim': 12, 'contamination': 0.1, 'metadata': {'name': 'test'}}
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'detector.bundle'
+        _write_durable(path, _stage_bundle(arrays, header).getbuffer())
+        assert not path.with_name(path.name + '.tmp').exists()
+        
+        for mmap_mode in (None, 'r'):
+            loaded, loaded_header = _read_bundle(path, mmap_mode=mmap_mode)
+            print(f"\nmmap_mode={mmap_mode}: {sorted(loaded)}")
+            
+            assert loaded_header == header
+            assert list(loaded) == list(arrays)
+            for name, array in arrays.items():
+                assert loaded[name].dtype == array.dtype, name
+                assert loaded[name].shape == array.shape, name
+                np.testing.assert_array_equal(loaded[name], array)
+            
+            # Empty records can't be mapped and come back as plain arrays
+            assert type(loaded['empty']) is np.ndarray
+            if mmap_mode is not None:
+                assert isinstance(loaded['scaler_mean'], np.memmap)
+            
+            # Quantized weights upcast losslessly, as _load_version does
+            upcast = loaded['ae_weight_0'].astype(np.float32, copy=False)
+            assert upcast.dtype == np.float32
+            np.testing.assert_array_equal(upcast, arrays['ae_weight_0'].astype(np.float32))
+            del loaded, upcast
+        
+        print(f"✓ {len(arrays)} arrays round-trip ({path.stat().st_size} bytes)")
+
+
+def test_stage_alignment():
+    """Every record starts on a BUNDLE_ALIGNMENT boundary"""
+    arrays = {f'a{i}': np.arange(i + 1, dtype=np.float64) for i in range(5)}
+    plain = _stage_bundle(arrays, {}).getvalue()
+    
+    footer_len = int.from_bytes(plain[-8:], 'little')
+    offsets = json.loads(plain[-8 - footer_len:-8])['arrays']
+    assert list(offsets) == list(arrays)
+    for offset in offsets.values():
+        assert offset % BUNDLE_ALIGNMENT == 0
+        assert plain[offset:offset + 6] == b'\x93NUMPY'
+    print(f"✓ {len(offsets)} records aligned to {BUNDLE_ALIGNMENT} bytes")
+
+
+def test_train_load_predict():
+    """train_model -> load_model in a fresh manager -> identical scores"""
+    print("\n" + "="*80)
+    print("TRAIN / LOAD / PREDICT")
+    print("="*80)
+    
+    rng = np.random.default_rng(1)
+    features = rng.normal(size=(300, 12)).astype(np.float32)
+    samples = np.vstack([rng.normal(size=(5, 12)), rng.uniform(-6, 6, size=(5, 12))]).astype(np.float32)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        with contextlib.redirect_stdout(io.StringIO()):
+            trained = ModelManager(Path(tmp))
+            version = trained.train_model(features, baseline_name='bundle-test')
+            assert trained.wait_for_saves()
+            
+            loaded = ModelManager(Path(tmp))
+            assert loaded.load_model(version)
+        
+        assert loaded.get_current_version() == version
+        assert loaded.model_info == trained.model_info
+        
+        for sample in samples:
+            expected = trained.predict(sample)
+            actual = loaded.predict(sample)
+            assert actual == expected, (expected, actual)
+        print(f"✓ {version}: {len(samples)} predictions identical after reload")
+        
+        # Release the mapped bundle before the directory is removed
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert loaded.delete_model(version)
+
+
+def test_failed_save_reported():
+    """wait_for_saves() reports a background save that raised, once"""
+    print("\n" + "="*80)
+    print("FAILED BACKGROUND SAVE")
+    print("="*80)
+    
+    features = np.random.default_rng(2).normal(size=(300, 8)).astype(np.float32)
+    
+    def failing_flush(version, bundle, info_json):
+        raise OSError("disk full")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        with contextlib.redirect_stdout(io.StringIO()):
+            manager = ModelManager(Path(tmp))
+            manager._flush_to_disk = failing_flush
+            version = manager.train_model(features, baseline_name='failing')
+            assert not manager.wait_for_saves()
+            # Reported once; later saves start from a clean slate
+            assert manager.wait_for_saves()
+            
+            # The half-written version is never offered as complete
+            assert not manager.load_model(version)
+            assert manager.list_models() == []
+        print(f"✓ {version}: failure reported by wait_for_saves()")
+
+
+def test_failed_delete_keeps_model():
+    """A delete_model that fails in rmtree leaves the current model loaded"""
+    print("\n" + "="*80)
+    print("FAILED DELETE")
+    print("="*80)
+    
+    features = np.random.default_rng(3).normal(size=(300, 8)).astype(np.float32)
+    
+    def failing_rmtree(path, *args, **kwargs):
+        raise PermissionError(f"locked: {path}")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        with contextlib.redirect_stdout(io.StringIO()):
+            manager = ModelManager(Path(tmp))
+            version = manager.train_model(features, baseline_name='locked')
+            assert manager.wait_for_saves()
+            expected = manager.predict(features[0])
+            
+            original_rmtree = model_manager.shutil.rmtree
+            model_manager.shutil.rmtree = failing_rmtree
+            try:
+                assert not manager.delete_model(version)
+            finally:
+                model_manager.shutil.rmtree = original_rmtree
+        
+        assert manager.get_current_version() == version
+        assert manager.model_info is not None and manager.model_info.version == version
+        assert manager.predict(features[0]) == expected
+        print(f"✓ {version} still loaded after the failed delete")
+        
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert manager.delete_model(version)
+
+
+def main():
+    """Run all tests"""
+    test_bundle_round_trip()
+    test_stage_alignment()
+    test_train_load_predict()
+    test_failed_save_reported()
+    test_failed_delete_keeps_model()
+    
+    print("\n" + "="*80)
+    print("TEST COMPLETE")
+    print("="*80)
+
+
+if __name__ == "__main__":
+    main()
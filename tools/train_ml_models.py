@@ -18,13 +18,13 @@ from pathlib import Path
 import numpy as np
 import pandas as pd
 
-# Add backend to path
+# Add backend to path; the ml_models modules are imported under the same
+# names as in the app (model_manager's relative imports need the package)
 sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
-sys.path.insert(0, str(Path(__file__).parent.parent / "backend" / "ml_models"))
 
-from feature_extractor import BatchFeatureExtractor
-from anomaly_detector import HybridAnomalyDetector
-from model_manager import ModelTrainer
+from ml_models.feature_extractor import BatchFeatureExtractor
+from ml_models.anomaly_detector import HybridAnomalyDetector
+from ml_models.model_manager import ModelTrainer
 
 
 def load_csv_data(baseline_dir: Path, num_sensors: int = 5) -> np.ndarray:
@@ -140,6 +140,10 @@ def train_models(features: np.ndarray, baseline_name: str = "structure",
     if not version:
         raise RuntimeError("Model training failed")
     
+    # Files are written in the background; verify_model reads them back
+    if not trainer.manager.wait_for_saves():
+        raise RuntimeError(f"Could not save model {version}")
+    
     return version
 
 